@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the asyncio blob helper's listing, concurrency bound and downloads.
+
+The container client is replaced with an in-memory fake, so these tests run without a storage account.
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+from types import SimpleNamespace
+
+# Add the package to path for testing
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from azure.core.exceptions import HttpResponseError
+from azure.storage.blob import BlobProperties
+from azure.storage.blob.aio import BlobPrefix
+from uainepydat import aioblobhelper
+from uainepydat import blobhelper
+
+ACCOUNT_URL = "http://127.0.0.1:10000/devstoreaccount1"
+
+def make_blob(name, content):
+    """Build a BlobProperties object as returned by a listing"""
+    blob = BlobProperties()
+    blob.name = name
+    blob.size = len(content)
+    blob.etag = '"0x8D0000000000001"'
+    return blob
+
+async def _iterate(items):
+    for item in items:
+        yield item
+
+class FakePager:
+    """Pages a listing like the SDK's AsyncItemPaged, counting pages fetched"""
+    def __init__(self, container, items, per_page):
+        self.container = container
+        self.pages = [items[start:start + per_page] for start in range(0, len(items), per_page)]
+
+    def by_page(self):
+        return self._pages()
+
+    async def _pages(self):
+        for page in self.pages:
+            await asyncio.sleep(0)
+            self.container.pages_fetched += 1
+            yield _iterate(page)
+
+class FakeDownloader:
+    """Streams content in 4 byte chunks with a delay per chunk"""
+    def __init__(self, container, content):
+        self.container = container
+        self.content = content
+
+    async def chunks(self):
+        try:
+            for start in range(0, len(self.content), 4):
+                await asyncio.sleep(self.container.delay)
+                yield self.content[start:start + 4]
+            self.container.completed += 1
+        finally:
+            self.container.in_flight -= 1
+
+class FakeBlobClient:
+    def __init__(self, container, blob_name):
+        self.container = container
+        self.blob_name = blob_name
+
+    async def download_blob(self, raw_response_hook=None, **kwargs):
+        container = self.container
+        statuses = container.sdk_retried.get(self.blob_name, [])
+        statuses = statuses + [500 if self.blob_name in container.failing else 200]
+        if raw_response_hook is not None:
+            for status in statuses:
+                raw_response_hook(SimpleNamespace(http_response=SimpleNamespace(status_code=status)))
+        if self.blob_name in container.failing:
+            await asyncio.sleep(container.delay)
+            error = HttpResponseError("server error")
+            error.status_code = 500
+            raise error
+        container.in_flight += 1
+        container.max_in_flight = max(container.max_in_flight, container.in_flight)
+        return FakeDownloader(container, container.contents[self.blob_name])
+
+class FakeContainerClient:
+    """Lists and serves blobs from a mapping of blob name to content"""
+    def __init__(self, contents, delay=0.0, failing=(), sdk_retried=None):
+        self.contents = contents
+        self.sdk_retried = sdk_retried or {}
+        self.blobs = [make_blob(name, content) for name, content in sorted(contents.items())]
+        self.delay = delay
+        self.failing = set(failing)
+        self.pages_fetched = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completed = 0
+
+    def walk_blobs(self, name_starts_with="", delimiter="/", results_per_page=5000):
+        items, prefixes = [], set()
+        for blob in self.blobs:
+            if not blob.name.startswith(name_starts_with):
+                continue
+            rest = blob.name[len(name_starts_with):]
+            if delimiter in rest:
+                prefix = name_starts_with + rest.split(delimiter)[0] + delimiter
+                if prefix not in prefixes:
+                    prefixes.add(prefix)
+                    items.append(BlobPrefix(prefix=prefix))
+            else:
+                items.append(blob)
+        return FakePager(self, items, results_per_page)
+
+    def list_blobs(self, name_starts_with="", results_per_page=5000):
+        return FakePager(self, [blob for blob in self.blobs if blob.name.startswith(name_starts_with)],
+                         results_per_page)
+
+    def get_blob_client(self, blob_name):
+        return FakeBlobClient(self, blob_name)
+
+def make_helper(container, max_concurrency=64, telemetry=None):
+    """An AsyncBlobHelper wired to a fake container client, created inside the running loop"""
+    helper = aioblobhelper.AsyncBlobHelper(ACCOUNT_URL, "test-container", None, max_concurrency=max_concurrency,
+                                           telemetry=telemetry)
+    helper._cont_client = container
+    helper._semaphore = asyncio.Semaphore(max_concurrency)
+    return helper
+
+def test_listing():
+    """Nested prefixes are walked with filters, and flat containers yield pages as they arrive"""
+    async def _run():
+        nested = FakeContainerClient({"top.csv": b"1", "raw/2024/a.csv": b"2", "raw/2025/b.parquet": b"3",
+                                      "ref/c.csv": b"4"})
+        helper = make_helper(nested)
+        names = {blob.name async for blob in helper.list_blob_content("", file_extn="csv")}
+        assert names == {"top.csv", "raw/2024/a.csv", "ref/c.csv"}
+
+        flat = FakeContainerClient({f"file{i:02d}.csv": b"x" for i in range(10)})
+        pages = make_helper(flat).iter_blob_pages(results_per_page=3)
+        first = await pages.__anext__()
+        assert [blob.name for blob in first] == ["file00.csv", "file01.csv", "file02.csv"]
+        assert flat.pages_fetched == 1
+        assert sum([len(page) async for page in pages]) == 7
+    asyncio.run(_run())
+
+def test_concurrency_bound_and_download():
+    """Downloads never exceed max_concurrency and land complete, with no partial files"""
+    async def _run():
+        contents = {f"daily/file{i}.csv": bytes([65 + i]) * 16 for i in range(8)}
+        container = FakeContainerClient(contents, delay=0.005)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            sizes = await make_helper(container, max_concurrency=3).download_all_blobs("daily/", temp_dir)
+            assert sizes == {name: 16 for name in contents}
+            assert sorted(os.listdir(temp_dir)) == sorted(os.path.basename(name) for name in contents)
+            for name, content in contents.items():
+                with open(os.path.join(temp_dir, os.path.basename(name)), "rb") as f:
+                    assert f.read() == content
+        assert container.max_in_flight == 3
+    asyncio.run(_run())
+
+def test_failure_cancels_remaining_downloads():
+    """The first failure cancels the other downloads and leaves no partial files"""
+    async def _run():
+        contents = {f"daily/file{i}.csv": b"x" * 64 for i in range(6)}
+        container = FakeContainerClient(contents, delay=0.01, failing={"daily/file0.csv"})
+        with tempfile.TemporaryDirectory() as temp_dir:
+            try:
+                await make_helper(container).download_all_blobs("daily/", temp_dir)
+                assert False, "the failed download should raise"
+            except HttpResponseError:
+                pass
+            await asyncio.sleep(0.2)
+            assert os.listdir(temp_dir) == []
+        assert container.completed == 0 and container.in_flight == 0
+    asyncio.run(_run())
+
+
+def test_download_telemetry():
+    """Responses retried inside the SDK are counted per blob, as are failures"""
+    async def _run():
+        contents = {f"daily/file{i}.csv": b"x" * 8 for i in range(3)}
+        container = FakeContainerClient(contents, failing={"daily/file2.csv"},
+                                        sdk_retried={"daily/file1.csv": [429, 503], "daily/file2.csv": [500]})
+        telemetry = blobhelper.TransferTelemetry()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            helper = make_helper(container, telemetry=telemetry)
+            await helper.download_blob(container.blobs[0], os.path.join(temp_dir, "file0.csv"))
+            await helper.download_blob(container.blobs[1], os.path.join(temp_dir, "file1.csv"))
+            try:
+                await helper.download_blob(container.blobs[2], os.path.join(temp_dir, "file2.csv"))
+                assert False, "the failed download should raise"
+            except HttpResponseError:
+                pass
+        records = telemetry.to_dataframe().set_index("blob_name")
+        assert records.loc["daily/file0.csv", ["bytes", "retries", "throttled", "status"]].tolist() == [8, 0, 0, 200]
+        assert records.loc["daily/file1.csv", ["bytes", "retries", "throttled", "status"]].tolist() == [8, 2, 2, 200]
+        assert records.loc["daily/file2.csv", ["retries", "throttled", "status"]].tolist() == [1, 0, 500]
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    print("Testing asyncio blob helper")
+    print("-" * 60)
+    test_listing()
+    print("✓ listing: PASSED")
+    test_concurrency_bound_and_download()
+    print("✓ concurrency bound and download: PASSED")
+    test_failure_cancels_remaining_downloads()
+    print("✓ failure cancels remaining downloads: PASSED")
+    test_download_telemetry()
+    print("✓ download telemetry: PASSED")
+    print("-" * 60)
+    print("All tests PASSED! ✓")
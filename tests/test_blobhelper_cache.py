@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the local BlobCache revalidation, TTL and LRU eviction.
+
+Blob clients are replaced with an in-memory fake, so these tests run without a storage account.
+"""
+
+import sys
+import os
+import time
+import tempfile
+from contextlib import contextmanager
+
+# Add the package to path for testing
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from uainepydat import blobhelper
+
+ACCOUNT_URL = "http://127.0.0.1:10000/devstoreaccount1"
+
+class FakeStore:
+    """Blob content and etags by name, counting property and download requests"""
+    def __init__(self, blobs):
+        self.blobs = {name: (content, '"etag-1"') for name, content in blobs.items()}
+        self.properties = 0
+        self.downloads = 0
+
+    def update(self, name, content, etag):
+        self.blobs[name] = (content, etag)
+
+@contextmanager
+def fake_blob_client(store):
+    """Serve BlobCache requests from a FakeStore instead of a storage account"""
+    class FakeProperties:
+        def __init__(self, etag):
+            self.etag = etag
+
+    class FakeDownloader:
+        def __init__(self, content):
+            self.content = content
+
+        def readinto(self, stream):
+            stream.write(self.content)
+            return len(self.content)
+
+    class FakeBlobClient:
+        def __init__(self, account_url, container_name, blob_name, credential=None):
+            self.blob_name = blob_name
+
+        def get_blob_properties(self):
+            store.properties += 1
+            return FakeProperties(store.blobs[self.blob_name][1])
+
+        def download_blob(self, etag=None, match_condition=None):
+            store.downloads += 1
+            content, current = store.blobs[self.blob_name]
+            assert etag == current
+            return FakeDownloader(content)
+
+    original = blobhelper.BlobClient
+    blobhelper.BlobClient = FakeBlobClient
+    try:
+        yield
+    finally:
+        blobhelper.BlobClient = original
+
+def test_etag_revalidation():
+    """Unchanged blobs are revalidated with one properties call, changed blobs are downloaded again"""
+    store = FakeStore({"ref/a.csv": b"version one"})
+    with fake_blob_client(store), tempfile.TemporaryDirectory() as temp_dir:
+        cache = blobhelper.BlobCache(temp_dir)
+        path = cache.fetch(ACCOUNT_URL, "ref", "ref/a.csv", None)
+        assert cache.read_bytes(ACCOUNT_URL, "ref", "ref/a.csv", None) == b"version one"
+        assert (store.properties, store.downloads) == (2, 1)
+
+        store.update("ref/a.csv", b"version two", '"etag-2"')
+        new_path = cache.fetch(ACCOUNT_URL, "ref", "ref/a.csv", None)
+        assert new_path != path and not os.path.exists(path)
+        assert cache.read_bytes(ACCOUNT_URL, "ref", "ref/a.csv", None) == b"version two"
+        assert (store.properties, store.downloads) == (4, 2)
+        assert cache.total_size() == len(b"version two")
+
+        cache.invalidate(ACCOUNT_URL, "ref", "ref/a.csv")
+        assert cache.total_size() == 0 and not os.path.exists(new_path)
+
+def test_ttl():
+    """Blobs younger than the ttl are served with no request, older ones are revalidated"""
+    store = FakeStore({"ref/a.csv": b"content"})
+    with fake_blob_client(store), tempfile.TemporaryDirectory() as temp_dir:
+        cache = blobhelper.BlobCache(temp_dir, ttl=60)
+        for _ in range(3):
+            cache.fetch(ACCOUNT_URL, "ref", "ref/a.csv", None)
+        assert (store.properties, store.downloads) == (1, 1)
+
+        cache.ttl = 0.01
+        time.sleep(0.02)
+        cache.fetch(ACCOUNT_URL, "ref", "ref/a.csv", None)
+        assert (store.properties, store.downloads) == (2, 1)
+
+def test_lru_eviction():
+    """Least recently used blobs are evicted first once the cache exceeds max_bytes"""
+    store = FakeStore({name: b"x" * 10 for name in ("a", "b", "c")})
+    with fake_blob_client(store), tempfile.TemporaryDirectory() as temp_dir:
+        cache = blobhelper.BlobCache(temp_dir, max_bytes=25)
+        paths = {}
+        for name in ("a", "b", "a"):
+            paths[name] = cache.fetch(ACCOUNT_URL, "ref", name, None)
+            time.sleep(0.01)
+        paths["c"] = cache.fetch(ACCOUNT_URL, "ref", "c", None)
+        assert cache.total_size() == 20
+        assert os.path.exists(paths["a"]) and os.path.exists(paths["c"]) and not os.path.exists(paths["b"])
+
+        cache.fetch(ACCOUNT_URL, "ref", "b", None)
+        assert store.downloads == 4
+        cache.clear()
+        assert cache.total_size() == 0
+
+if __name__ == "__main__":
+    print("Testing blob cache")
+    print("-" * 60)
+    test_etag_revalidation()
+    print("✓ etag revalidation: PASSED")
+    test_ttl()
+    print("✓ ttl: PASSED")
+    test_lru_eviction()
+    print("✓ lru eviction: PASSED")
+    print("-" * 60)
+    print("All tests PASSED! ✓")
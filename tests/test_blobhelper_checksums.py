@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script to verify blob checksum retrieval and local verification using listing metadata.
+
+Blobs with an MD5 in their listing are resolved without any network call, so these tests
+run without a storage account.
+"""
+
+import sys
+import os
+import hashlib
+import tempfile
+
+# Add the package to path for testing
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from azure.storage.blob import BlobProperties, ContentSettings
+from uainepydat import blobhelper
+from uainepydat import fileio
+
+ACCOUNT_URL = "http://127.0.0.1:10000/devstoreaccount1"
+
+def make_blob(name, content):
+    """Build a BlobProperties object as returned by a listing"""
+    blob = BlobProperties()
+    blob.name = name
+    blob.size = len(content)
+    blob.content_settings = ContentSettings(content_md5=bytearray(hashlib.md5(content).digest()))
+    return blob
+
+def test_checksums_from_listing():
+    """Checksums are taken from the listing metadata in both formats"""
+    blob = make_blob("folder/a.txt", b"Hello, World!")
+    hex_sums = blobhelper.get_blob_md5_checksums(ACCOUNT_URL, "test-container", None, [blob], use_hex=True)
+    b64_sums = blobhelper.get_blob_md5_checksums(ACCOUNT_URL, "test-container", None, [blob])
+    assert hex_sums == {"folder/a.txt": hashlib.md5(b"Hello, World!").hexdigest()}
+    assert b64_sums == {"folder/a.txt": "ZajifYh5KDgxtmS9i38K1A=="}
+
+def test_verify_blob_checksums():
+    """Local files are classified as matched, mismatched or missing"""
+    blobs = [
+        make_blob("folder/good.txt", b"good content"),
+        make_blob("folder/bad.txt", b"expected content"),
+        make_blob("folder/absent.txt", b"never downloaded"),
+    ]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with open(os.path.join(temp_dir, "good.txt"), "wb") as f:
+            f.write(b"good content")
+        with open(os.path.join(temp_dir, "bad.txt"), "wb") as f:
+            f.write(b"truncated")
+
+        report = blobhelper.verify_blob_checksums(ACCOUNT_URL, "test-container", None, blobs, temp_dir)
+
+    assert report["matched"] == ["folder/good.txt"]
+    assert [name for name, _, _ in report["mismatched"]] == ["folder/bad.txt"]
+    assert report["missing_local"] == ["folder/absent.txt"]
+    assert report["no_remote_md5"] == []
+
+def test_verify_preserved_structure():
+    """Same-named blobs in different folders are verified against their own local copies"""
+    blobs = [
+        make_blob("sales/year=2024/month=01/part.parquet", b"january"),
+        make_blob("sales/year=2024/month=02/part.parquet", b"february"),
+    ]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = [blobhelper.get_local_blob_path(temp_dir, blob.name, preserve_structure=True) for blob in blobs]
+        blobhelper.create_local_blob_dirs(paths)
+        for path, content in zip(paths, (b"january", b"february")):
+            with open(path, "wb") as f:
+                f.write(content)
+
+        report = blobhelper.verify_blob_checksums(ACCOUNT_URL, "test-container", None, blobs, temp_dir,
+                                                  preserve_structure=True)
+
+    assert report["matched"] == [blob.name for blob in blobs]
+    assert report["mismatched"] == []
+
+def test_verify_with_checksum_cache():
+    """A checksum cache gives the same report and skips rehashing on the next run"""
+    blobs = [make_blob("folder/good.txt", b"good content"), make_blob("folder/bad.txt", b"expected content")]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, content in (("good.txt", b"good content"), ("bad.txt", b"truncated")):
+            with open(os.path.join(temp_dir, name), "wb") as f:
+                f.write(content)
+        cache = fileio.ChecksumCache(os.path.join(temp_dir, "cache", "checksums.sqlite"))
+        for _ in range(2):
+            report = blobhelper.verify_blob_checksums(ACCOUNT_URL, "test-container", None, blobs, temp_dir,
+                                                      checksum_cache=cache)
+            assert report["matched"] == ["folder/good.txt"]
+            assert [name for name, _, _ in report["mismatched"]] == ["folder/bad.txt"]
+        assert cache.last_run == {"files": 2, "hashed": 0, "reused": 2}
+
+if __name__ == "__main__":
+    print("Testing blob checksum retrieval and verification")
+    print("-" * 60)
+    test_checksums_from_listing()
+    print("✓ checksums from listing: PASSED")
+    test_verify_blob_checksums()
+    print("✓ verify blob checksums: PASSED")
+    test_verify_preserved_structure()
+    print("✓ verify preserved structure: PASSED")
+    test_verify_with_checksum_cache()
+    print("✓ verify with checksum cache: PASSED")
+    print("-" * 60)
+    print("All tests PASSED! ✓")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script to verify blob listing filters and inventory output.
+
+Listing pages are built locally, so these tests run without a storage account.
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime, timezone
+
+# Add the package to path for testing
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import duckdb
+import pyarrow.parquet as pq
+from azure.storage.blob import BlobProperties
+from uainepydat import blobhelper
+
+def make_blob(name, size, modified):
+    """Build a BlobProperties object as returned by a listing"""
+    blob = BlobProperties()
+    blob.name = name
+    blob.size = size
+    blob.last_modified = modified
+    blob.etag = '"0x8D0000000000000"'
+    return blob
+
+BLOBS = [
+    make_blob("raw/2024/a.csv", 10, datetime(2024, 1, 1, tzinfo=timezone.utc)),
+    make_blob("raw/2024/b.parquet", 20, datetime(2024, 6, 1, tzinfo=timezone.utc)),
+    make_blob("raw/2025/c.csv", 30, datetime(2025, 1, 1, tzinfo=timezone.utc)),
+]
+
+def test_blob_filters():
+    """Glob, regex, extension and modified-since filters"""
+    def names(**kwargs):
+        keep = blobhelper._make_blob_filter(**kwargs)
+        return [blob.name for blob in BLOBS if keep(blob)]
+
+    assert names(pattern="raw/2024/*") == ["raw/2024/a.csv", "raw/2024/b.parquet"]
+    assert names(regex=r"\.csv$") == ["raw/2024/a.csv", "raw/2025/c.csv"]
+    assert names(file_extn="parquet") == ["raw/2024/b.parquet"]
+    assert names(modified_since=datetime(2024, 3, 1, tzinfo=timezone.utc)) == ["raw/2024/b.parquet", "raw/2025/c.csv"]
+    assert blobhelper._glob_literal_prefix("raw/20*/x.csv") == "raw/20"
+
+def test_write_blob_inventory():
+    """Pages are written to both Parquet and DuckDB inventories"""
+    pages = [BLOBS[:2], BLOBS[2:]]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        parquet_path = os.path.join(temp_dir, "inventory.parquet")
+        assert blobhelper.write_blob_inventory(iter(pages), parquet_path) == 3
+        assert pq.read_table(parquet_path).column("size").to_pylist() == [10, 20, 30]
+
+        db_path = os.path.join(temp_dir, "inventory.duckdb")
+        assert blobhelper.write_blob_inventory(iter(pages), db_path) == 3
+        with duckdb.connect(db_path) as con:
+            assert con.sql("SELECT SUM(size) FROM blob_inventory").fetchone()[0] == 60
+
+if __name__ == "__main__":
+    print("Testing blob listing filters and inventories")
+    print("-" * 60)
+    test_blob_filters()
+    print("✓ blob filters: PASSED")
+    test_write_blob_inventory()
+    print("✓ write blob inventory: PASSED")
+    print("-" * 60)
+    print("All tests PASSED! ✓")
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the duckdb helper functions against an in-memory database.
+"""
+
+import sys
+import os
+
+# Add the package to path for testing
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import duckdb
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+from uainepydat import datahash
+from uainepydat import duckfunc
+
+def make_schema_frame():
+    """VARNAME/TYPE frame as used by init_table"""
+    return pd.DataFrame({"VARNAME": ["id", "name"], "TYPE": ["INTEGER", "VARCHAR"]})
+
+def test_does_table_exist():
+    """Existence checks, including names that would break an interpolated query"""
+    con = duckdb.connect()
+    assert not duckfunc.does_table_exist(con, "memory", "customers")
+    duckfunc.init_table(con, make_schema_frame(), "memory", "customers")
+    assert duckfunc.does_table_exist(con, "memory", "customers")
+    assert not duckfunc.does_table_exist(con, "memory", "customers' OR '1'='1")
+
+def test_catalog_snapshot():
+    """The catalog snapshot answers lookups and is invalidated by DDL"""
+    con = duckdb.connect()
+    catalog = duckfunc.DuckCatalog(con)
+    assert not catalog.table_exists("memory", "customers")
+
+    assert duckfunc.init_table(con, make_schema_frame(), "memory", "customers", catalog=catalog)
+    assert catalog.table_exists("memory", "customers")
+    assert not duckfunc.init_table(con, make_schema_frame(), "memory", "customers", catalog=catalog)
+    assert catalog.get_columns("memory", "customers") == {"id": "INTEGER", "name": "VARCHAR"}
+
+    catalog.execute("CREATE TABLE orders (id INTEGER)")
+    assert ("memory", "main", "orders") in catalog.list_tables("memory")
+
+def make_sample_table(con):
+    """Ten row table with an id, group and label column"""
+    con.execute("CREATE TABLE sample AS SELECT i AS id, i % 3 AS grp, 'row' || i AS label FROM range(10) r(i)")
+
+def test_table_return_types():
+    """Tables are returned as pandas, Arrow, Polars or streamed record batches"""
+    con = duckdb.connect()
+    make_sample_table(con)
+    assert isinstance(duckfunc.get_table_as_df(con, "memory", "sample"), pd.DataFrame)
+    assert isinstance(duckfunc.get_table_as_df(con, "memory", "sample", return_type="arrow"), pa.Table)
+    assert isinstance(duckfunc.get_table_as_df(con, "memory", "sample", return_type="polars"), pl.DataFrame)
+    reader = duckfunc.get_table_batch_reader(con, "memory", "sample", batch_size=4)
+    assert sum(batch.num_rows for batch in reader) == 10
+
+def test_save_from_db_copy():
+    """Native COPY export, including compression and partitioning"""
+    con = duckdb.connect()
+    make_sample_table(con)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for extn in ("parquet", "csv", "psv", "json"):
+            path = os.path.join(temp_dir, f"sample.{extn}")
+            assert duckfunc.save_from_db(con, "memory", "sample", path)
+            assert os.path.exists(path)
+        assert len(pd.read_csv(os.path.join(temp_dir, "sample.psv"), sep="|")) == 10
+
+        part_dir = os.path.join(temp_dir, "partitioned")
+        assert duckfunc.save_from_db(con, "memory", "sample", part_dir, format="parquet",
+                                     compression="zstd", partition_by=["grp"])
+        assert sorted(os.listdir(part_dir)) == ["grp=0", "grp=1", "grp=2"]
+    assert not duckfunc.save_from_db(con, "memory", "missing", "missing.parquet")
+
+def test_bulk_load():
+    """Globbed PSV files, zero-copy frames and each load mode"""
+    con = duckdb.connect()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for i in range(3):
+            frame = pd.DataFrame({"code": [f"0{i}{j}" for j in range(4)], "value": range(4)})
+            frame.to_csv(os.path.join(temp_dir, f"daily_{i}.psv"), sep="|", index=False)
+
+        stats = duckfunc.bulk_load(con, "codes", os.path.join(temp_dir, "*.psv"), column_types={"code": "VARCHAR"})
+        assert stats["rows"] == 12
+        assert con.sql("SELECT MIN(code) FROM codes").fetchone()[0] == "000"
+
+        parquet_path = os.path.join(temp_dir, "numeric.parquet")
+        pd.DataFrame({"code": [7, 8], "value": [1, 2]}).to_parquet(parquet_path)
+        duckfunc.bulk_load(con, "numeric_codes", parquet_path, column_types={"code": "VARCHAR"})
+        assert con.sql("SELECT typeof(min(code)), min(code) FROM numeric_codes").fetchone() == ("VARCHAR", "7")
+
+    assert duckfunc.bulk_load(con, "codes", pl.DataFrame({"code": ["999"], "value": [1]}), mode="append")["rows"] == 1
+    duckfunc.bulk_load(con, "codes", pa.table({"code": ["000", "998"], "value": [50, 51]}), mode="upsert", keys=["code"])
+    assert con.sql("SELECT value FROM codes WHERE code = '000'").fetchall() == [(50,)]
+    assert con.sql("SELECT COUNT(*) FROM codes").fetchone()[0] == 14
+
+    duckfunc.bulk_load(con, "codes", pd.DataFrame({"code": ["a"], "value": [1]}), mode="replace")
+    assert con.sql("SELECT COUNT(*) FROM codes").fetchone()[0] == 1
+
+def test_connection_manager():
+    """Tuned settings, attached databases and per-thread cursors"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        settings = {"threads": 2, "temp_directory": os.path.join(temp_dir, "spill")}
+        attach = {"ref": os.path.join(temp_dir, "reference.duckdb")}
+        with duckfunc.DuckConnectionManager(settings=settings, attach=attach) as manager:
+            assert manager.con.sql("SELECT current_setting('threads')").fetchone()[0] == 2
+            assert "ref" in set(manager.attached()["DB_NAME"])
+            manager.cursor().execute("CREATE TABLE ref.codes AS SELECT * FROM range(100)")
+
+            def count_rows(_):
+                return id(manager.cursor()), manager.cursor().sql("SELECT COUNT(*) FROM ref.codes").fetchone()[0]
+
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(count_rows, range(16)))
+            assert {count for _, count in results} == {100}
+
+def test_init_table_schema_forms():
+    """Schemas given as a frame, dict, pyarrow schema or Polars schema, created in one transaction"""
+    frame = make_schema_frame()
+    frame["NULLABLE"] = [False, True]
+    frame["COMPRESSION"] = ["rle", None]
+    ddl = duckfunc.TableSchema.from_any(frame, primary_key=["id"]).to_ddl("db.customers")
+    assert ddl == ("CREATE TABLE IF NOT EXISTS db.customers (id INTEGER USING COMPRESSION rle NOT NULL, "
+                   "name VARCHAR, PRIMARY KEY (id))")
+
+    con = duckdb.connect()
+    schemas = {
+        "from_frame": frame,
+        "from_dict": {"id": "INTEGER", "label": {"dtype": "VARCHAR", "default": "'none'"}},
+        "from_arrow": pa.schema([("id", pa.int64()), ("seen", pa.timestamp("us", tz="UTC"))]),
+        "from_polars": {"id": pl.Int32, "name": pl.String},
+    }
+    assert duckfunc.init_tables(con, schemas, "memory") == list(schemas)
+    assert duckfunc.init_tables(con, schemas, "memory") == []
+    catalog = duckfunc.DuckCatalog(con)
+    assert catalog.get_columns("memory", "from_arrow") == {"id": "BIGINT", "seen": "TIMESTAMP WITH TIME ZONE"}
+    assert catalog.get_columns("memory", "from_polars") == {"id": "INTEGER", "name": "VARCHAR"}
+
+def test_query_cache():
+    """Cached results are reused, and not served after a load changes the table"""
+    con = duckdb.connect()
+    make_sample_table(con)
+    duckfunc.make_version_meta_table(con, "1.0", "sample")
+    cache = duckfunc.DuckQueryCache(con, max_bytes=1, spill_dir=tempfile.mkdtemp())
+    query = "SELECT grp, COUNT(*) AS n FROM sample GROUP BY grp ORDER BY grp"
+    first = cache.query(query)
+    assert cache.query("  SELECT grp,  COUNT(*) AS n\n FROM sample GROUP BY grp ORDER BY grp;") is first
+    assert cache.stats()["hits"] == 1
+    duckfunc.bulk_load(con, "sample", pd.DataFrame({"id": [10], "grp": [0], "label": ["row10"]}), mode="append")
+    assert cache.query(query).column("n").to_pylist() == [5, 3, 3]
+    cache.query("SELECT 1")
+    assert cache.query_df(query)["n"].tolist() == [5, 3, 3]
+    assert cache.stats()["hits"] == 2
+
+def test_query_cache_replaced_and_qualified_tables():
+    """Replacing a table without a meta table, or loading it by a qualified name, invalidates results"""
+    con = duckdb.connect()
+    cache = duckfunc.DuckQueryCache(con)
+    duckfunc.bulk_load(con, "s", pd.DataFrame({"v": [1, 2]}), mode="replace")
+    assert cache.query("SELECT sum(v) AS v FROM s").column("v").to_pylist() == [3]
+    duckfunc.bulk_load(con, "s", pd.DataFrame({"v": [10, 20]}), mode="replace")
+    assert cache.query("SELECT sum(v) AS v FROM s").column("v").to_pylist() == [30]
+
+    duckfunc.make_version_meta_table(con, "1.0", "sample")
+    assert cache.query("SELECT sum(v) AS v FROM main.s").column("v").to_pylist() == [30]
+    con.execute("UPDATE s SET v = 5")
+    duckfunc.touch_table_version(con, "main.s")
+    assert cache.query("SELECT sum(v) AS v FROM main.s").column("v").to_pylist() == [10]
+
+def test_query_cache_update_only_upsert():
+    """An upsert that only updates rows invalidates results without a meta table, and DDL drops fingerprints"""
+    con = duckdb.connect()
+    cache = duckfunc.DuckQueryCache(con)
+    duckfunc.upsert(con, "facts", pd.DataFrame({"id": [1, 2, 3], "value": [10, 20, 30]}), ["id"])
+    query = "SELECT sum(value) AS total FROM facts"
+    assert cache.query(query).column("total").to_pylist() == [60]
+    assert cache.query(query).column("total").to_pylist() == [60]
+    stats = duckfunc.upsert(con, "facts", pd.DataFrame({"id": [2], "value": [25]}), ["id"])
+    assert (stats["inserted"], stats["updated"]) == (0, 1)
+    assert cache.query(query).column("total").to_pylist() == [65]
+    assert cache.stats()["hits"] == 1
+
+    catalog = duckfunc.DuckCatalog(con)
+    catalog.execute("CREATE OR REPLACE TABLE facts AS SELECT 1 AS id, 1 AS value")
+    assert cache.query(query).column("total").to_pylist() == [1]
+    con.execute("CREATE OR REPLACE TABLE facts AS SELECT 2 AS id, 2 AS value")
+    cache.forget("main.facts")
+    assert cache.query(query).column("total").to_pylist() == [2]
+
+def test_upsert_and_append_new():
+    """Deltas insert new rows, update changed rows and skip unchanged or already loaded rows"""
+    con = duckdb.connect()
+    frame = pd.DataFrame({"id": [1, 2, 3], "value": [10, 20, 30], "ts": [1, 2, 3]})
+    assert duckfunc.upsert(con, "facts", frame, ["id"])["inserted"] == 3
+    delta = pa.table({"id": [2, 3, 4], "value": [20, 33, 40], "ts": [2, 3, 4]})
+    stats = duckfunc.upsert(con, "facts", delta, ["id"])
+    assert (stats["inserted"], stats["updated"], stats["skipped"]) == (1, 1, 1)
+    assert con.sql("SELECT value FROM facts ORDER BY id").fetchall() == [(10,), (20,), (33,), (40,)]
+
+    # tables without a key constraint are updated without ON CONFLICT
+    con.execute("CREATE TABLE plain AS SELECT * FROM facts")
+    stats = duckfunc.upsert(con, "plain", pd.DataFrame({"id": [1, 9], "value": [11, 90], "ts": [5, 9]}), ["id"])
+    assert (stats["inserted"], stats["updated"]) == (1, 1)
+    try:
+        duckfunc.upsert(con, "facts", pd.DataFrame({"id": [7, 7], "value": [1, 2], "ts": [1, 1]}), ["id"])
+        assert False, "duplicate source keys should be rejected"
+    except ValueError:
+        pass
+    assert con.sql("SELECT count(*) FROM facts").fetchone()[0] == 4
+
+    # a same-named table with a key in another database doesn't make the target look keyed
+    con.execute("ATTACH ':memory:' AS w")
+    con.execute("CREATE TABLE w.cust (id INTEGER PRIMARY KEY, value INTEGER)")
+    con.execute("CREATE TABLE cust (id INTEGER, value INTEGER)")
+    con.execute("INSERT INTO cust VALUES (1, 1)")
+    stats = duckfunc.upsert(con, "cust", pd.DataFrame({"id": [1, 2], "value": [5, 6]}), ["id"])
+    assert (stats["inserted"], stats["updated"]) == (1, 1)
+    stats = duckfunc.upsert(con, "w.cust", pd.DataFrame({"id": [1, 2], "value": [5, 6]}), ["id"])
+    assert (stats["inserted"], stats["updated"]) == (2, 0)
+    assert con.sql("SELECT * FROM w.cust ORDER BY id").fetchall() == [(1, 5), (2, 6)]
+
+    late = pd.DataFrame({"id": [8, 9, 10], "value": [0, 0, 0], "ts": [9, 9, 10]})
+    stats = duckfunc.append_new(con, "plain", late, "ts", keys=["id"])
+    assert (stats["inserted"], stats["skipped"]) == (2, 1)
+    stats = duckfunc.append_new(con, "plain", pd.DataFrame({"id": [11, 12], "value": [0, 0], "ts": [10, 11]}), "ts")
+    assert (stats["inserted"], stats["skipped"]) == (1, 1)
+
+def test_profile_table():
+    """Tables, parquet globs and frames are profiled and appended to a stats table"""
+    con = duckdb.connect()
+    make_sample_table(con)
+    stats = duckfunc.profile_table(con, "sample", quantiles=[0.1, 0.9], stats_table="table_stats")
+    assert stats["column_name"].tolist() == ["id", "grp", "label"]
+    assert stats.loc[0, "count"] == 10 and stats.loc[0, "p90"] >= 8
+    assert stats["p10"].isna().tolist() == [False, False, True]
+
+    out_dir = tempfile.mkdtemp()
+    con.sql("SELECT * FROM sample").write_parquet(os.path.join(out_dir, "part0.parquet"))
+    duckfunc.profile_table(con, os.path.join(out_dir, "*.parquet"), quantiles=[0.5], stats_table="table_stats")
+    frame_stats = duckfunc.profile_table(con, pd.DataFrame({"a": [1.0, None, 3.0]}))
+    assert float(frame_stats.loc[0, "null_percentage"]) == 33.33
+    assert con.sql("SELECT count(DISTINCT source), count(*) FROM table_stats").fetchone() == (2, 6)
+
+def test_export_import_database():
+    """A database round-trips through parallel export and import with its column types"""
+    con = duckdb.connect()
+    make_sample_table(con)
+    con.execute("CREATE SCHEMA staging")
+    con.execute("CREATE TABLE staging.codes AS SELECT '007' AS code, 1.5::DECIMAL(10, 2) AS rate")
+    for format in ("parquet", "psv"):
+        out_dir = tempfile.mkdtemp()
+        manifest = duckfunc.export_database(con, "memory", out_dir, format=format, max_workers=2)
+        assert sorted((entry["table"], entry["rows"]) for entry in manifest["tables"]) == [("codes", 1), ("sample", 10)]
+        assert os.path.exists(os.path.join(out_dir, "manifest.json"))
+
+        restored = duckdb.connect()
+        assert duckfunc.import_database(restored, out_dir) == {"main.sample": 10, "staging.codes": 1}
+        assert restored.sql("SELECT code, typeof(rate) FROM staging.codes").fetchone() == ("007", "DECIMAL(10,2)")
+
+    # every per-table cursor is closed once its table is done
+    class CursorTracker:
+        def __init__(self, con):
+            self.con = con
+            self.cursors = []
+
+        def cursor(self):
+            self.cursors.append(self.con.cursor())
+            return self.cursors[-1]
+
+        def __getattr__(self, name):
+            return getattr(self.con, name)
+
+    tracked = CursorTracker(duckdb.connect())
+    duckfunc.import_database(tracked, out_dir)
+    duckfunc.export_database(tracked, "memory", tempfile.mkdtemp(), max_workers=2)
+    assert len(tracked.cursors) == 4
+    for cursor in tracked.cursors:
+        try:
+            cursor.execute("SELECT 1")
+            assert False, "the cursor should be closed"
+        except duckdb.ConnectionException:
+            pass
+
+    with open(os.path.join(out_dir, "sample.psv"), "a") as file:
+        file.write("99|0|row99\n")
+    try:
+        duckfunc.import_database(duckdb.connect(), out_dir)
+        assert False, "a modified file should fail verification"
+    except ValueError:
+        pass
+
+def test_profile_queries():
+    """Statements run in a profiling block are logged with timings, operators and plans"""
+    con = duckdb.connect()
+    make_sample_table(con)
+    log_dir = tempfile.mkdtemp()
+    with duckfunc.profile_queries(con, log_dir=log_dir) as profiled:
+        assert profiled.execute("SELECT grp, count(*) FROM sample GROUP BY grp ORDER BY grp").fetchone() == (0, 4)
+        assert profiled.execute("SELECT count(*) FROM sample WHERE id > ?", [4]).fetchall() == [(5,)]
+        duckfunc.bulk_load(profiled, "copy_of_sample", con.sql("SELECT * FROM sample").df())
+    log = profiled.to_dataframe()
+    assert log["query"].str.startswith("CREATE TABLE copy_of_sample").any()
+    assert "GROUP_BY" in log.loc[0, "operators"] and "Total Time" in log.loc[0, "plan"]
+    assert con.execute("SELECT current_setting('enable_profiling')").fetchone()[0] is None
+
+    slowest = duckfunc.get_slowest_queries(con, n=2)
+    assert len(slowest) == 2 and slowest["latency"].is_monotonic_decreasing
+    assert len(duckfunc.get_slowest_queries(con, n=100, log_dir=log_dir)) == len(log)
+
+    # results are read from DuckDB as fetched, and partly fetched results are recorded when profiling stops
+    with duckfunc.profile_queries(con, log_table=None) as profiled:
+        result = profiled.execute("SELECT * FROM range(100000) r(i)")
+        assert result.fetchmany(3) == [(0,), (1,), (2,)] and result.fetchone() == (3,)
+        assert profiled.records == []
+    assert profiled.records[0]["rows"] == 100000
+    with duckfunc.profile_queries(con, log_table=None) as profiled:
+        assert len(profiled.execute("SELECT * FROM sample").df()) == 10
+        assert len(profiled.records) == 1
+
+def test_register_hash_function():
+    """SQL macros and Arrow UDFs give the datahash digests, with nulls kept"""
+    con = duckdb.connect()
+    make_sample_table(con)
+    labels = [row[0] for row in con.sql("SELECT label FROM sample ORDER BY id").fetchall()]
+    expected = {
+        "sha256": [datahash.hash256(v, "salt") for v in labels],
+        "md5": [datahash.hashmd5(v, "salt") for v in labels],
+        "hmac": [datahash.hashhmac(v, b"salt") for v in labels],
+    }
+    for method, digests in expected.items():
+        for engine in ("sql", "arrow"):
+            name = f"pseudo_{method}_{engine}"
+            duckfunc.register_hash_function(con, name, method, "salt", engine=engine)
+            assert [row[0] for row in con.sql(f"SELECT {name}(label) FROM sample ORDER BY id").fetchall()] == digests
+            assert con.sql(f"SELECT {name}(NULL)").fetchone()[0] is None
+    # numeric columns are hashed as their text form by every scheme
+    for method in ("sha256", "md5", "hmac"):
+        duckfunc.register_hash_function(con, f"pseudo_num_{method}", method, "salt")
+        digests = [row[0] for row in con.sql(f"SELECT pseudo_num_{method}(id) FROM sample ORDER BY id").fetchall()]
+        assert digests == datahash.hash_column(pd.Series(range(10)), method, "salt").tolist()
+    assert con.sql("SELECT pseudo_num_hmac(1.5::DECIMAL(4, 2))").fetchone()[0] == datahash.hashhmac("1.50", b"salt")
+    long_key = b"k" * 100
+    duckfunc.register_hash_function(con, "pseudo_long_key", "hmac", long_key)
+    assert con.sql("SELECT pseudo_long_key('abc')").fetchone()[0] == datahash.hashhmac("abc", long_key)
+
+if __name__ == "__main__":
+    print("Testing duckdb helper functions")
+    print("-" * 60)
+    test_does_table_exist()
+    print("✓ does table exist: PASSED")
+    test_catalog_snapshot()
+    print("✓ catalog snapshot: PASSED")
+    test_table_return_types()
+    print("✓ table return types: PASSED")
+    test_save_from_db_copy()
+    print("✓ save from db with COPY: PASSED")
+    test_bulk_load()
+    print("✓ bulk load: PASSED")
+    test_connection_manager()
+    print("✓ connection manager: PASSED")
+    test_init_table_schema_forms()
+    print("✓ init table schema forms: PASSED")
+    test_query_cache()
+    print("✓ query cache: PASSED")
+    test_query_cache_replaced_and_qualified_tables()
+    print("✓ query cache replaced and qualified tables: PASSED")
+    test_query_cache_update_only_upsert()
+    print("✓ query cache update-only upsert: PASSED")
+    test_upsert_and_append_new()
+    print("✓ upsert and append new: PASSED")
+    test_profile_table()
+    print("✓ profile table: PASSED")
+    test_export_import_database()
+    print("✓ export and import database: PASSED")
+    test_profile_queries()
+    print("✓ profile queries: PASSED")
+    test_register_hash_function()
+    print("✓ register hash function: PASSED")
+    print("-" * 60)
+    print("All tests PASSED! ✓")
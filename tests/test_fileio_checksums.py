@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script to verify streaming, recursive directory checksums in fileio.
+"""
+
+import sys
+import os
+
+# Add the package to path for testing
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import hashlib
+import tempfile
+from uainepydat import fileio
+
+TEST_FILES = {
+    "test1.txt": b"Hello, World!",
+    "test2.psv": b"a|b\n1|2\n",
+    "sub/test3.psv": b"x" * 100_000,
+    "sub/tmp/test4.psv": b"",
+}
+
+def make_test_dir():
+    """Temporary directory holding TEST_FILES, including nested folders"""
+    temp_dir = tempfile.mkdtemp()
+    for rel_path, content in TEST_FILES.items():
+        file_path = os.path.join(temp_dir, rel_path)
+        fileio.create_filepath_dirs(file_path)
+        with open(file_path, "wb") as f:
+            f.write(content)
+    return temp_dir
+
+def test_calculate_checksums_recursive():
+    """Checksums of nested files match hashlib for each algorithm"""
+    temp_dir = make_test_dir()
+    for algorithm in ("md5", "sha256", "blake2b"):
+        result = fileio.calculate_checksums(temp_dir, algorithm, chunk_size=4096, max_workers=3)
+        expected = {os.path.join(temp_dir, *rel_path.split("/")): hashlib.new(algorithm, content).hexdigest()
+                    for rel_path, content in TEST_FILES.items()}
+        assert result == expected
+
+def test_calculate_checksums_filters_and_manifest():
+    """Include/exclude patterns and non-recursive listing, with a manifest of relative paths"""
+    temp_dir = make_test_dir()
+    manifest_path = os.path.join(tempfile.mkdtemp(), "manifest.json")
+    result = fileio.calculate_checksums(temp_dir, "sha256", include=["*.psv"], exclude=["sub/tmp/*"],
+                                        manifest_path=manifest_path)
+    assert sorted(os.path.relpath(path, temp_dir).replace(os.sep, "/") for path in result) == ["sub/test3.psv", "test2.psv"]
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    assert manifest["algorithm"] == "sha256"
+    assert manifest["files"]["sub/test3.psv"] == {"size": 100_000,
+                                                  "checksum": hashlib.sha256(TEST_FILES["sub/test3.psv"]).hexdigest()}
+    assert len(fileio.calculate_checksums(temp_dir, recursive=False)) == 2
+
+def test_checksum_cache():
+    """Only modified files are rehashed, and verify catches content changed under unchanged metadata"""
+    temp_dir = make_test_dir()
+    cache = fileio.ChecksumCache(os.path.join(tempfile.mkdtemp(), "checksums.sqlite"))
+    first = cache.calculate_checksums(temp_dir)
+    assert first == fileio.calculate_checksums(temp_dir)
+    assert cache.calculate_checksums(temp_dir) == first and cache.last_run["hashed"] == 0
+
+    modified = os.path.join(temp_dir, "test2.psv")
+    with open(modified, "wb") as f:
+        f.write(b"a|b\n3|4\n")
+    cache.calculate_checksums(temp_dir)
+    assert cache.last_run == {"files": 4, "hashed": 1, "reused": 3}
+
+    corrupted = os.path.join(temp_dir, "test1.txt")
+    stat = os.stat(corrupted)
+    with open(corrupted, "wb") as f:
+        f.write(b"Hello, Wor1d!")
+    os.utime(corrupted, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    report = cache.verify(sample=1.0)
+    assert report["checked"] == 4 and [path for path, _, _ in report["corrupted"]] == [os.path.abspath(corrupted)]
+
+    os.remove(modified)
+    assert len(cache.calculate_checksums(temp_dir, prune=True)) == 3
+    assert cache.verify(sample=10)["checked"] == 3
+
+if __name__ == "__main__":
+    print("Testing fileio checksums")
+    print("-" * 60)
+    test_calculate_checksums_recursive()
+    print("✓ calculate checksums recursive: PASSED")
+    test_calculate_checksums_filters_and_manifest()
+    print("✓ calculate checksums filters and manifest: PASSED")
+    test_checksum_cache()
+    print("✓ checksum cache: PASSED")
+    print("-" * 60)
+    print("All tests PASSED! ✓")
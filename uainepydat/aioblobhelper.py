@@ -0,0 +1,315 @@
+import os
+import time
+import asyncio
+# the asyncio client yields its own BlobPrefix class, unrelated to azure.storage.blob.BlobPrefix
+from azure.storage.blob.aio import BlobServiceClient, BlobPrefix
+from azure.core import MatchConditions
+from azure.core.exceptions import ClientAuthenticationError, HttpResponseError
+from uainepydat import blobhelper
+
+try:
+    import aiohttp
+    from azure.core.pipeline.transport import AioHttpTransport
+except ImportError:
+    aiohttp = None
+
+async def _gather_or_cancel(aws):
+    """
+    Await coroutines concurrently like ``asyncio.gather``, cancelling the rest if one fails.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+class AsyncBlobHelper:
+    """
+    Asyncio counterparts of the blobhelper functions for a single container.
+
+    All requests made through one helper share an aiohttp session and are bounded by a
+    semaphore, so hundreds of blob operations can be awaited together without opening a
+    connection per call. A session can be passed in to share it between several helpers,
+    e.g. for multiple containers; otherwise one is created and closed with the helper.
+
+    Args:
+        account_url (str): The Azure Storage account URL.
+        container (str): The name of the container.
+        sastoken (str): The SAS token for authentication.
+        max_concurrency (int, optional): Maximum number of requests in flight. Defaults to 64.
+        session (aiohttp.ClientSession, optional): Session to share. Defaults to None.
+        telemetry (blobhelper.TransferTelemetry, optional): Collects per-blob download metrics.
+                                 Defaults to None.
+
+    Example:
+        >>> async with AsyncBlobHelper(account_url, "landing", sastoken) as helper:
+        ...     blobs = [blob async for blob in helper.list_blob_content("daily/", file_extn="psv")]
+        ...     await helper.download_all_blobs("daily/", "downloads", preserve_structure=True)
+    """
+    def __init__(self, account_url, container, sastoken, max_concurrency=64, session=None, telemetry=None):
+        self.account_url = account_url
+        self.container = container
+        self.sastoken = sastoken
+        self.max_concurrency = max_concurrency
+        self._session = session
+        self._owns_session = session is None
+        self.telemetry = telemetry
+        self._semaphore = None
+        self._service_client = None
+        self._cont_client = None
+
+    async def __aenter__(self):
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for AsyncBlobHelper. Install it with 'pip install aiohttp'.")
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        transport = AioHttpTransport(session=self._session, session_owner=False)
+        self._service_client = BlobServiceClient(account_url=self.account_url, credential=self.sastoken,
+                                                 transport=transport)
+        self._cont_client = self._service_client.get_container_client(self.container)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._service_client.close()
+        if self._owns_session:
+            await self._session.close()
+            self._session = None
+
+    async def check_sas_token(self):
+        """
+        Checks if the SAS token is valid for the container.
+
+        Returns:
+            bool: True if the SAS token is valid and has access, False otherwise.
+            str: Optional error message if invalid.
+        """
+        try:
+            async with self._semaphore:
+                await self._cont_client.get_container_properties()
+            return True, "SAS token is valid."
+        except (ClientAuthenticationError, HttpResponseError) as e:
+            return False, f"SAS token is invalid or does not have access: {e}"
+        except Exception as e:
+            return False, f"Unexpected error: {e}"
+
+    async def list_blob_content(self, folder_path, file_extn=""):
+        """
+        Asynchronously iterate over the blobs below a folder path.
+
+        Args:
+            folder_path (str): The folder path prefix to filter blobs by.
+            file_extn (str, optional): File extension to filter blobs by. Defaults to "".
+
+        Yields:
+            BlobProperties: Each matching blob.
+        """
+        async for page in self.iter_blob_pages(folder_path, file_extn=file_extn):
+            for blob in page:
+                yield blob
+
+    async def iter_blob_pages(self, folder_path="", file_extn="", pattern=None, regex=None,
+                              modified_since=None, results_per_page=5000):
+        """
+        Asynchronously list blobs page by page, walking the top-level prefixes concurrently.
+
+        Accepts the same filters as ``blobhelper.iter_blob_pages``.
+
+        Yields:
+            list: Non-empty pages of BlobProperties objects. Page order across prefixes is not guaranteed.
+        """
+        prefix = folder_path or ""
+        if pattern:
+            literal = blobhelper._glob_literal_prefix(pattern)
+            if literal.startswith(prefix):
+                prefix = literal
+            elif not prefix.startswith(literal):
+                return
+        keep = blobhelper._make_blob_filter(file_extn, pattern, regex, modified_since)
+
+        sub_prefixes = []
+        walk_pages = self._cont_client.walk_blobs(name_starts_with=prefix, delimiter="/",
+                                                  results_per_page=results_per_page).by_page()
+        while True:
+            async with self._semaphore:
+                try:
+                    walk_page = await walk_pages.__anext__()
+                except StopAsyncIteration:
+                    break
+                page = []
+                async for item in walk_page:
+                    if isinstance(item, BlobPrefix):
+                        sub_prefixes.append(item.name)
+                    elif keep(item):
+                        page.append(item)
+            if page:
+                yield page
+        if not sub_prefixes:
+            return
+
+        pages = asyncio.Queue(maxsize=len(sub_prefixes) * 2)
+        done = object()
+
+        async def _list_prefix(sub_prefix):
+            try:
+                blob_pages = self._cont_client.list_blobs(name_starts_with=sub_prefix,
+                                                          results_per_page=results_per_page).by_page()
+                while True:
+                    # hold a slot only while a page is being fetched, not while it waits to be consumed
+                    async with self._semaphore:
+                        try:
+                            blob_page = await blob_pages.__anext__()
+                        except StopAsyncIteration:
+                            break
+                        filtered = [blob async for blob in blob_page if keep(blob)]
+                    if filtered:
+                        await pages.put(filtered)
+            except Exception as e:
+                await pages.put(e)
+            await pages.put(done)
+
+        tasks = [asyncio.ensure_future(_list_prefix(sub_prefix)) for sub_prefix in sub_prefixes]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await pages.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def iter_blob_chunks(self, blob_name, offset=None, length=None):
+        """
+        Asynchronously stream a blob's content in chunks.
+
+        Args:
+            blob_name (str): The full name of the blob.
+            offset (int, optional): Byte offset to start from. Defaults to None (start of blob).
+            length (int, optional): Number of bytes to read. Defaults to None (to end of blob).
+
+        Yields:
+            bytes: Successive chunks of the blob's content.
+        """
+        blob_client = self._cont_client.get_blob_client(blob_name)
+        async with self._semaphore:
+            stream = await blob_client.download_blob(offset=offset, length=length)
+        chunks = stream.chunks()
+        while True:
+            async with self._semaphore:
+                try:
+                    chunk = await chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+            yield chunk
+
+    async def download_blob(self, blob, down_path):
+        """
+        Download a single blob to a local file via a temporary file renamed on success.
+
+        The temporary file is removed if the download fails or is cancelled.
+
+        Args:
+            blob (BlobProperties): The blob to download, as returned by a listing.
+            down_path (str): Local file path to write to.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        blob_client = self._cont_client.get_blob_client(blob.name)
+        part_path = blobhelper._partial_download_path(down_path, blob)
+        kwargs = {"etag": blob.etag, "match_condition": MatchConditions.IfNotModified} if blob.etag else {}
+        responses = blobhelper._ResponseCounter()
+        written = 0
+        start = time.perf_counter()
+        try:
+            async with self._semaphore:
+                stream = await blob_client.download_blob(raw_response_hook=responses, **kwargs)
+                with open(part_path, "wb") as file:
+                    async for chunk in stream.chunks():
+                        await asyncio.to_thread(file.write, chunk)
+                        written += len(chunk)
+            os.replace(part_path, down_path)
+        except BaseException as e:
+            # failed or cancelled, don't leave the partial file behind
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            if self.telemetry is not None and isinstance(e, Exception):
+                status = getattr(e, "status_code", None)
+                self.telemetry.record(blob.name, written, time.perf_counter() - start,
+                                      retries=responses.retries(failed=status is not None),
+                                      throttled=responses.throttled, status=status, error=str(e))
+            raise
+        if self.telemetry is not None:
+            self.telemetry.record(blob.name, written, time.perf_counter() - start, retries=responses.retries(),
+                                  throttled=responses.throttled, status=responses.status)
+        return written
+
+    async def download_all_blobs(self, folder_path, download_loc, file_extn="", makedirs=True,
+                                 preserve_structure=False):
+        """
+        Download all blobs below a folder path concurrently.
+
+        Args:
+            folder_path (str): The folder path prefix to filter blobs by.
+            download_loc (str): Local directory path where blobs will be downloaded.
+            file_extn (str, optional): File extension to filter blobs by. Defaults to "".
+            makedirs (bool, optional): Whether to create the download directory if it doesn't exist.
+                                     Defaults to True.
+            preserve_structure (bool, optional): Whether to mirror the blobs' virtual folder
+                                     hierarchy below download_loc. Defaults to False.
+
+        Returns:
+            dict: A mapping of blob names to the number of bytes written.
+
+        Raises:
+            Exception: The first download error; the remaining downloads are cancelled.
+        """
+        blobs = [blob async for blob in self.list_blob_content(folder_path, file_extn=file_extn)]
+        os.makedirs(download_loc, exist_ok=makedirs)
+        down_paths = {blob.name: blobhelper.get_local_blob_path(download_loc, blob.name, preserve_structure)
+                      for blob in blobs}
+        if preserve_structure:
+            await asyncio.to_thread(blobhelper.create_local_blob_dirs, down_paths.values())
+
+        sizes = await _gather_or_cancel(self.download_blob(blob, down_paths[blob.name]) for blob in blobs)
+        return dict(zip(down_paths, sizes))
+
+    async def get_blob_md5_checksums(self, blob_list, use_hex=False):
+        """
+        Retrieve MD5 checksums for a list of blobs.
+
+        As with ``blobhelper.get_blob_md5_checksums``, listing metadata is used where present and
+        properties are only requested, concurrently, for blobs without an MD5.
+
+        Args:
+            blob_list (list): List of BlobProperties objects.
+            use_hex (bool): If True, returns checksum as hex; otherwise Base64. Default is False.
+
+        Returns:
+            dict: A dictionary mapping blob names to their MD5 checksums, or None if not available.
+        """
+        checksums = {}
+        missing = []
+        for blob in blob_list:
+            content_settings = getattr(blob, "content_settings", None)
+            checksums[blob.name] = blobhelper._encode_md5(getattr(content_settings, "content_md5", None), use_hex)
+            if checksums[blob.name] is None:
+                missing.append(blob.name)
+
+        async def _fetch(blob_name):
+            async with self._semaphore:
+                props = await self._cont_client.get_blob_client(blob_name).get_blob_properties()
+            return blobhelper._encode_md5(props.content_settings.content_md5, use_hex)
+
+        results = await _gather_or_cancel(_fetch(blob_name) for blob_name in missing)
+        checksums.update(zip(missing, results))
+        return checksums
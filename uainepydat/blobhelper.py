@@ -1,8 +1,21 @@
 import os
+import re
+import time
+import queue
+import fnmatch
+import hashlib
+import threading
+import uuid
 from tqdm import tqdm
-from azure.storage.blob import BlobServiceClient, BlobClient
+from azure.storage.blob import BlobServiceClient, BlobClient, BlobPrefix
 import base64
-from azure.core.exceptions import ClientAuthenticationError, HttpResponseError
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
+from azure.core import MatchConditions
+from azure.core.exceptions import (ClientAuthenticationError, HttpResponseError, IncompleteReadError,
+                                   ResourceModifiedError, ServiceRequestError, ServiceResponseError)
+from uainepydat import fileio
 
 def check_sas_token(account_url, container, sastoken):
     """
@@ -95,7 +108,379 @@ def list_blob_content(account_url, container, folder_path, sastoken, file_extn =
     #implied else
     return blobs
 
-def download_all_blobs(account_url, container, folder_path, sastoken, download_loc, file_extn="", makedirs=True):
+def _glob_literal_prefix(pattern):
+    """
+    Return the part of a glob pattern before its first wildcard.
+    """
+    match = re.search(r"[*?\[]", pattern)
+    return pattern[:match.start()] if match else pattern
+
+def _make_blob_filter(file_extn="", pattern=None, regex=None, modified_since=None):
+    """
+    Build a predicate applying the client-side listing filters to a BlobProperties object.
+    """
+    compiled = re.compile(regex) if regex else None
+
+    def _keep(blob):
+        if file_extn and not blob.name.endswith("." + file_extn):
+            return False
+        if pattern and not fnmatch.fnmatchcase(blob.name, pattern):
+            return False
+        if compiled and not compiled.search(blob.name):
+            return False
+        if modified_since and (blob.last_modified is None or blob.last_modified < modified_since):
+            return False
+        return True
+    return _keep
+
+def iter_blob_pages(account_url, container, sastoken, folder_path="", file_extn="", pattern=None, regex=None,
+                    modified_since=None, results_per_page=5000, max_workers=8):
+    """
+    Lazily list blobs page by page, walking the top-level prefixes in parallel.
+
+    The hierarchy directly below folder_path is walked once with ``walk_blobs``, after which
+    every sub-prefix is listed by its own worker thread. Pages are yielded as soon as any
+    worker produces one, so iteration can begin, or stop, long before the whole container
+    has been listed. Only a bounded number of pages are buffered ahead of the consumer.
+
+    Args:
+        account_url (str): The Azure Storage account URL.
+        container (str): The name of the container to list blobs from.
+        sastoken (str): The SAS token for authentication.
+        folder_path (str, optional): Prefix to list below. Defaults to "" (whole container).
+        file_extn (str, optional): File extension to filter blobs by (e.g., 'txt'). Defaults to "".
+        pattern (str, optional): Glob matched against the full blob name (e.g. 'raw/*/2024-*.csv').
+                                 Its literal leading part is also used to narrow the listing server-side.
+        regex (str, optional): Regular expression searched for in the full blob name.
+        modified_since (datetime, optional): Timezone-aware datetime; only blobs modified at or after
+                                 it are kept.
+        results_per_page (int, optional): Page size requested from the service. Defaults to 5000.
+        max_workers (int, optional): Number of prefixes listed concurrently. Defaults to 8.
+
+    Yields:
+        list: Non-empty pages of BlobProperties objects. Page order across prefixes is not guaranteed.
+    """
+    prefix = folder_path or ""
+    if pattern:
+        literal = _glob_literal_prefix(pattern)
+        if literal.startswith(prefix):
+            prefix = literal
+        elif not prefix.startswith(literal):
+            # the pattern cannot match anything below folder_path
+            return
+
+    keep = _make_blob_filter(file_extn, pattern, regex, modified_since)
+    blob_serv_client = BlobServiceClient(account_url=account_url, credential=sastoken)
+    cont_client = blob_serv_client.get_container_client(container)
+
+    # walk one level of the hierarchy, blobs at this level are yielded directly
+    sub_prefixes = []
+    page = []
+    for item in cont_client.walk_blobs(name_starts_with=prefix, delimiter="/", results_per_page=results_per_page):
+        if isinstance(item, BlobPrefix):
+            sub_prefixes.append(item.name)
+        elif keep(item):
+            page.append(item)
+            if len(page) >= results_per_page:
+                yield page
+                page = []
+    if page:
+        yield page
+    if not sub_prefixes:
+        return
+
+    pages = queue.Queue(maxsize=max_workers * 2)
+    stop = threading.Event()
+    done = object()
+
+    def _put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _list_prefix(sub_prefix):
+        try:
+            blob_pages = cont_client.list_blobs(name_starts_with=sub_prefix, results_per_page=results_per_page)
+            for blob_page in blob_pages.by_page():
+                filtered = [blob for blob in blob_page if keep(blob)]
+                if filtered and not _put(filtered):
+                    return
+        except Exception as e:
+            _put(e)
+        finally:
+            _put(done)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for sub_prefix in sub_prefixes:
+            executor.submit(_list_prefix, sub_prefix)
+        remaining = len(sub_prefixes)
+        while remaining:
+            item = pages.get()
+            if item is done:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def iter_blobs(account_url, container, sastoken, folder_path="", **kwargs):
+    """
+    Lazily iterate over individual blobs, see ``iter_blob_pages`` for the supported filters.
+
+    Yields:
+        BlobProperties: Each blob matching the filters.
+    """
+    for page in iter_blob_pages(account_url, container, sastoken, folder_path, **kwargs):
+        yield from page
+
+def _blob_page_to_arrow(page):
+    """
+    Convert a page of BlobProperties objects into a pyarrow Table for inventories.
+    """
+    return pa.table({
+        "name": pa.array([blob.name for blob in page], pa.string()),
+        "size": pa.array([blob.size for blob in page], pa.int64()),
+        "last_modified": pa.array([blob.last_modified for blob in page], pa.timestamp("us", tz="UTC")),
+        "etag": pa.array([blob.etag for blob in page], pa.string()),
+        "content_md5": pa.array([_encode_md5(getattr(blob.content_settings, "content_md5", None), use_hex=True)
+                                 for blob in page], pa.string()),
+        "content_type": pa.array([getattr(blob.content_settings, "content_type", None) for blob in page],
+                                 pa.string()),
+        "blob_tier": pa.array([str(blob.blob_tier) if blob.blob_tier else None for blob in page], pa.string()),
+    })
+
+def write_blob_inventory(pages, output_path, table_name="blob_inventory"):
+    """
+    Write a blob listing straight to a Parquet file or DuckDB table, one page at a time.
+
+    Args:
+        pages (iterable): Pages of BlobProperties objects, e.g. from ``iter_blob_pages``.
+        output_path (str): Destination. A ``.parquet`` path writes a Parquet file; a ``.duckdb``
+                           or ``.db`` path writes (replacing) table_name in that database.
+        table_name (str, optional): Table name for DuckDB output. Defaults to "blob_inventory".
+
+    Returns:
+        int: The number of blobs written.
+    """
+    format = fileio.get_file_extension(output_path)
+    if format not in ("parquet", "duckdb", "db"):
+        raise ValueError(f"Unsupported file extension {format}")
+    fileio.create_filepath_dirs(output_path)
+
+    rows = 0
+    if format == "parquet":
+        writer = None
+        try:
+            for page in pages:
+                batch = _blob_page_to_arrow(page)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, batch.schema)
+                writer.write_table(batch)
+                rows += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            pq.write_table(_blob_page_to_arrow([]), output_path)
+        return rows
+
+    import duckdb
+    with duckdb.connect(output_path) as con:
+        con.register("inventory_page", _blob_page_to_arrow([]))
+        con.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM inventory_page")
+        for page in pages:
+            batch = _blob_page_to_arrow(page)
+            con.register("inventory_page", batch)
+            con.execute(f"INSERT INTO {table_name} SELECT * FROM inventory_page")
+            rows += batch.num_rows
+        con.unregister("inventory_page")
+    return rows
+
+THROTTLING_STATUS_CODES = (429, 503)
+
+class _ResponseCounter:
+    """
+    ``raw_response_hook`` recording the status of every HTTP response of one blob transfer.
+
+    The storage pipeline calls the hook after its retry policy, so responses the SDK retries
+    internally (408, 429, 5xx) are seen as well as the ones that surface as exceptions.
+    """
+    def __init__(self):
+        self.statuses = []
+
+    def __call__(self, response):
+        self.statuses.append(response.http_response.status_code)
+
+    @property
+    def status(self):
+        return self.statuses[-1] if self.statuses else None
+
+    @property
+    def throttled(self):
+        return sum(status in THROTTLING_STATUS_CODES for status in self.statuses)
+
+    def retries(self, failed=False):
+        """
+        Number of responses that were retried: every transient one, except a final failing response.
+        """
+        retried = sum(status in TRANSIENT_STATUS_CODES for status in self.statuses)
+        if failed and self.status in TRANSIENT_STATUS_CODES:
+            retried -= 1
+        return retried
+
+class TransferTelemetry:
+    """
+    Collects per-blob transfer metrics from the blob helper download functions.
+
+    Pass an instance as ``telemetry`` to ``download_all_blobs``, ``download_all_blobs_in_chunks``
+    or ``AsyncBlobHelper`` and one record is kept per blob with its bytes, duration, retry and
+    throttling counts and final HTTP status. Retries and throttled (429/503) responses are
+    counted per HTTP response, including those retried inside the SDK's own retry policy.
+    Recording is thread-safe.
+
+    Args:
+        callback (callable, optional): Called with each record (a dict) as it is recorded,
+                                       e.g. to forward it to a metrics system. Defaults to None.
+
+    Example:
+        >>> telemetry = TransferTelemetry()
+        >>> download_all_blobs(account_url, container, "daily/", sastoken, "downloads",
+        ...                    max_workers=16, telemetry=telemetry)
+        >>> telemetry.summary()["latency_p95_s"]
+    """
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.records = []
+        self._lock = threading.Lock()
+
+    def record(self, blob_name, nbytes, seconds, retries=0, throttled=0, status=200, error=None):
+        """
+        Record the outcome of a single blob transfer.
+
+        Args:
+            blob_name (str): The full name of the blob.
+            nbytes (int): Bytes transferred.
+            seconds (float): Wall time spent on the blob, including retries.
+            retries (int, optional): Number of retried attempts. Defaults to 0.
+            throttled (int, optional): Number of attempts rejected with 429/503. Defaults to 0.
+            status (int, optional): Final HTTP status. Defaults to 200.
+            error (str, optional): Error message if the transfer failed. Defaults to None.
+        """
+        entry = {
+            "blob_name": blob_name,
+            "bytes": nbytes,
+            "seconds": seconds,
+            "mb_per_s": nbytes / 1024 / 1024 / seconds if seconds > 0 else 0.0,
+            "retries": retries,
+            "throttled": throttled,
+            "status": status,
+            "error": error,
+        }
+        with self._lock:
+            self.records.append(entry)
+        if self.callback is not None:
+            self.callback(entry)
+
+    def to_dataframe(self):
+        """
+        Return the recorded transfers as a pandas DataFrame, one row per blob.
+        """
+        import pandas as pd
+        with self._lock:
+            return pd.DataFrame(self.records, columns=["blob_name", "bytes", "seconds", "mb_per_s",
+                                                       "retries", "throttled", "status", "error"])
+
+    def summary(self):
+        """
+        Summarise the recorded transfers.
+
+        Returns:
+            dict: Counts of blobs, failures, retries and throttled attempts, total bytes,
+                  p50/p95/p99 per-blob latency in seconds and p50/p95/p99 per-blob MB/s.
+        """
+        df = self.to_dataframe()
+        ok = df[df["error"].isna()]
+        summary = {
+            "blobs": len(df),
+            "failed": int(df["error"].notna().sum()),
+            "bytes": int(df["bytes"].sum()),
+            "retries": int(df["retries"].sum()),
+            "throttled": int(df["throttled"].sum()),
+        }
+        for q in (50, 95, 99):
+            summary[f"latency_p{q}_s"] = float(ok["seconds"].quantile(q / 100)) if len(ok) else None
+            summary[f"mb_per_s_p{q}"] = float(ok["mb_per_s"].quantile(q / 100)) if len(ok) else None
+        return summary
+
+    def throughput_histogram(self, bins=10):
+        """
+        Return a histogram of per-blob throughput as a DataFrame of MB/s bins and blob counts.
+        """
+        import pandas as pd
+        ok = self.to_dataframe()
+        ok = ok[ok["error"].isna()]
+        counts = pd.cut(ok["mb_per_s"], bins=bins).value_counts(sort=False)
+        return pd.DataFrame({"mb_per_s": counts.index.astype(str), "blobs": counts.values})
+
+def get_local_blob_path(download_loc, blob_name, preserve_structure=False):
+    """
+    Map a blob name to the local file path it is downloaded to.
+
+    Args:
+        download_loc (str): Local download directory.
+        blob_name (str): Full name of the blob within its container.
+        preserve_structure (bool, optional): If True, the blob's virtual folders are mirrored
+                                 below download_loc; otherwise only the base name is used.
+                                 Defaults to False.
+
+    Returns:
+        str: The local file path.
+
+    Raises:
+        ValueError: If the blob name would resolve to a path outside download_loc.
+    """
+    if not preserve_structure:
+        return os.path.join(download_loc, os.path.basename(blob_name))
+
+    local_path = os.path.normpath(os.path.join(download_loc, *blob_name.split("/")))
+    root = os.path.normpath(download_loc)
+    if os.path.commonpath([os.path.abspath(root), os.path.abspath(local_path)]) != os.path.abspath(root):
+        raise ValueError(f"Blob name {blob_name} resolves outside of {download_loc}")
+    return local_path
+
+def create_local_blob_dirs(local_paths, max_workers=8):
+    """
+    Create, once each, every directory needed for a set of local download paths.
+
+    Only the deepest directories are created explicitly (their parents come with them), and
+    they are created concurrently.
+
+    Args:
+        local_paths (iterable): Local file paths, e.g. from ``get_local_blob_path``.
+        max_workers (int, optional): Number of directories created concurrently. Defaults to 8.
+
+    Returns:
+        int: The number of directories requested.
+    """
+    dirs = {os.path.dirname(path) for path in local_paths}
+    dirs.discard("")
+    parents = {os.path.dirname(d) for d in dirs}
+    leaves = [d for d in dirs if d not in parents]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(lambda d: os.makedirs(d, exist_ok=True), leaves))
+    return len(leaves)
+
+def download_all_blobs(account_url, container, folder_path, sastoken, download_loc, file_extn="", makedirs=True,
+                       preserve_structure=False, max_workers=1, telemetry=None):
     """
     Download all blobs from an Azure Storage container to a local directory.
 
@@ -109,77 +494,551 @@ def download_all_blobs(account_url, container, folder_path, sastoken, download_l
                                  If empty, downloads all blobs. Defaults to "".
         makedirs (bool, optional): Whether to create the download directory if it doesn't exist. 
                                  Defaults to True.
+        preserve_structure (bool, optional): Whether to mirror the blobs' virtual folder
+                                 hierarchy (e.g. ``year=2024/month=01/``) below download_loc.
+                                 Defaults to False.
+        max_workers (int, optional): Number of blobs downloaded concurrently. Defaults to 1.
+        telemetry (TransferTelemetry, optional): Collects per-blob transfer metrics. Defaults to None.
 
     Note:
         This function will create the download directory if it doesn't exist and makedirs is True.
-        Files are downloaded with their original names from the blob storage.
+        Files are downloaded with their original names from the blob storage. Without
+        preserve_structure, blobs with the same name in different folders overwrite each other;
+        each is written to a temporary file and renamed into place, so the survivor is always
+        one complete blob.
     """
-    blobs = list_blob_content(account_url, container, folder_path, sastoken, file_extn=file_extn)
+    blobs = list(list_blob_content(account_url, container, folder_path, sastoken, file_extn=file_extn))
 
     os.makedirs(download_loc, exist_ok=makedirs)
+    down_paths = {blob.name: get_local_blob_path(download_loc, blob.name, preserve_structure) for blob in blobs}
+    if preserve_structure:
+        create_local_blob_dirs(down_paths.values())
     
     blob_serv_client = BlobServiceClient(account_url=account_url, credential=sastoken)
     cont_client = blob_serv_client.get_container_client(container)
-    for blob in tqdm(blobs, desc="Downloading", unit="file"):
+
+    def _download(blob):
         blob_client = cont_client.get_blob_client(blob.name)
-        down_path = os.path.join(download_loc, os.path.basename(blob.name))
-    
-        with open(down_path, "wb") as file:
-            file.write(blob_client.download_blob().readall())
+        # each blob gets its own temporary file, so same-named blobs downloaded concurrently
+        # replace each other whole instead of interleaving writes
+        part_path = f"{down_paths[blob.name]}.{uuid.uuid4().hex}.part"
+        responses = _ResponseCounter()
+        start = time.perf_counter()
+        try:
+            with open(part_path, "wb") as file:
+                nbytes = blob_client.download_blob(raw_response_hook=responses).readinto(file)
+            os.replace(part_path, down_paths[blob.name])
+        except Exception as e:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            if telemetry is not None:
+                status = getattr(e, "status_code", None)
+                telemetry.record(blob.name, 0, time.perf_counter() - start,
+                                 retries=responses.retries(failed=status is not None),
+                                 throttled=responses.throttled, status=status, error=str(e))
+            raise
+        if telemetry is not None:
+            telemetry.record(blob.name, nbytes, time.perf_counter() - start, retries=responses.retries(),
+                             throttled=responses.throttled, status=responses.status)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(tqdm(executor.map(_download, blobs), total=len(blobs), desc="Downloading", unit="file"))
+
+TRANSIENT_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+def _is_transient_error(error):
+    """
+    Check whether an exception raised during a transfer is worth retrying.
+    """
+    if isinstance(error, (ServiceRequestError, ServiceResponseError, IncompleteReadError, ConnectionError)):
+        return True
+    if isinstance(error, HttpResponseError):
+        return error.status_code in TRANSIENT_STATUS_CODES
+    return False
+
+def _partial_download_path(down_path, blob):
+    """
+    Path of the temporary file a blob is streamed into before being renamed into place.
+
+    The blob's etag is part of the name, so a partial file is only ever resumed against
+    the same version of the blob it was started from.
+    """
+    etag = (blob.etag or "").strip('"')
+    return f"{down_path}.{etag}.part" if etag else f"{down_path}.part"
+
+def _download_blob_resumable(blob_client, blob, down_path, max_retries, backoff_factor, progress=None, stats=None):
+    """
+    Stream a single blob to disk, resuming from any partial file with ranged requests.
+
+    If a stats dict is given, its ``retries``, ``throttled`` and ``status`` keys are updated.
+    If the blob has changed since it was listed (412), its partial file is removed.
+
+    Returns:
+        int: The number of bytes transferred over the network for this blob.
+    """
+    if stats is None:
+        stats = {}
+    stats.update(retries=0, throttled=0, status=None)
+    part_path = _partial_download_path(down_path, blob)
+    responses = _ResponseCounter()
+    # retries after errors with no HTTP response (e.g. dropped connections), which the hook can't see
+    unanswered_retries = 0
+    transferred = 0
+    attempt = 0
+    while True:
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if offset > blob.size:
+            # stale or corrupt partial file, start over
+            os.remove(part_path)
+            offset = 0
+        try:
+            if offset < blob.size:
+                kwargs = {"etag": blob.etag, "match_condition": MatchConditions.IfNotModified} if blob.etag else {}
+                stream = blob_client.download_blob(offset=offset, length=blob.size - offset,
+                                                   raw_response_hook=responses, **kwargs)
+                with open(part_path, "ab") as file:
+                    for chunk in stream.chunks():
+                        file.write(chunk)
+                        transferred += len(chunk)
+                        if progress is not None:
+                            progress.update(len(chunk))
+            elif not os.path.exists(part_path):
+                # zero byte blob
+                open(part_path, "wb").close()
+            os.replace(part_path, down_path)
+            stats.update(retries=responses.retries() + unanswered_retries, throttled=responses.throttled,
+                         status=responses.status or (206 if offset else 200))
+            return transferred
+        except Exception as e:
+            status = getattr(e, "status_code", None)
+            stats.update(retries=responses.retries(failed=status is not None) + unanswered_retries,
+                         throttled=responses.throttled, status=status)
+            if isinstance(e, ResourceModifiedError) or status == 412:
+                # the blob changed since it was listed, so its partial data can never be resumed
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                raise
+            if attempt >= max_retries or not _is_transient_error(e):
+                raise
+            wait = backoff_factor * (2 ** attempt)
+            attempt += 1
+            if status is None:
+                unanswered_retries += 1
+            print(f"Transient error downloading {blob.name} ({e}), retry {attempt}/{max_retries} in {wait}s")
+            time.sleep(wait)
 
 def download_all_blobs_in_chunks(account_url, container, folder_path, sastoken, download_loc, 
-                                 file_extn="", makedirs=True, chunk_size=16 * 1024 * 1024):
+                                 file_extn="", makedirs=True, chunk_size=16 * 1024 * 1024,
+                                 max_retries=5, backoff_factor=1.0, preserve_structure=False, telemetry=None):
+    """
+    Download all blobs from an Azure Storage container to a local directory in chunks.
+
+    Each blob is streamed into a temporary ``.part`` file that is atomically renamed to its
+    final name once complete, so a failed transfer never leaves a truncated file in place.
+    Transient errors (timeouts, throttling, dropped connections) are retried with exponential
+    backoff, and each retry, or a later call, resumes from the bytes already on disk using
+    HTTP range requests instead of starting the blob again.
+
+    Args:
+        account_url (str): The Azure Storage account URL.
+        container (str): The name of the container to download blobs from.
+        folder_path (str): The folder path prefix to filter blobs by.
+        sastoken (str): The SAS token for authentication.
+        download_loc (str): Local directory path where blobs will be downloaded.
+        file_extn (str, optional): File extension to filter blobs by (e.g., 'txt', 'pdf'). 
+                                 If empty, downloads all blobs. Defaults to "".
+        makedirs (bool, optional): Whether to create the download directory if it doesn't exist. 
+                                 Defaults to True.
+        chunk_size (int, optional): Size in bytes of each ranged request. Defaults to 16 MB.
+        max_retries (int, optional): Retries per blob for transient errors. Defaults to 5.
+        backoff_factor (float, optional): Base wait in seconds between retries, doubled after
+                                 each attempt. Defaults to 1.0.
+        preserve_structure (bool, optional): Whether to mirror the blobs' virtual folder
+                                 hierarchy below download_loc. Defaults to False.
+        telemetry (TransferTelemetry, optional): Collects per-blob transfer metrics. Defaults to None.
+
+    Returns:
+        dict: A summary with the keys ``downloaded`` (list of blob names), ``failed``
+              (dict of blob name to error message), ``bytes`` (bytes transferred),
+              ``seconds`` (elapsed wall time) and ``mb_per_s`` (measured throughput).
+    """
     blobs = list(list_blob_content(account_url, container, folder_path, sastoken, file_extn=file_extn))
     print(f"Number of blobs found: {len(blobs)}")
     os.makedirs(download_loc, exist_ok=makedirs)
+    down_paths = {blob.name: get_local_blob_path(download_loc, blob.name, preserve_structure) for blob in blobs}
+    if preserve_structure:
+        create_local_blob_dirs(down_paths.values())
 
-    blob_serv_client = BlobServiceClient(account_url=account_url, credential=sastoken)
+    blob_serv_client = BlobServiceClient(account_url=account_url, credential=sastoken,
+                                         max_single_get_size=chunk_size, max_chunk_get_size=chunk_size)
     cont_client = blob_serv_client.get_container_client(container)
 
     # Precompute total download size
     total_bytes = sum(blob.size for blob in blobs)
     print(f"Downloading {round(total_bytes/1024/1024, 2)} MB of data")
 
+    summary = {"downloaded": [], "failed": {}, "bytes": 0}
+    start = time.perf_counter()
     with tqdm(total=total_bytes, unit='B', unit_scale=True, unit_divisor=1024, desc="Total Download") as total_bar:
         for blob in blobs:
             blob_client = cont_client.get_blob_client(blob.name)
-            down_path = os.path.join(download_loc, os.path.basename(blob.name))
+            down_path = down_paths[blob.name]
+            part_path = _partial_download_path(down_path, blob)
+            if os.path.exists(part_path):
+                # count bytes already on disk from an earlier attempt
+                total_bar.update(min(os.path.getsize(part_path), blob.size))
             print(f"Downloading to: {down_path}")
+            stats = {}
+            blob_start = time.perf_counter()
             try:
-                with open(down_path, "wb") as file:
-                    stream = blob_client.download_blob()
-                    for chunk in stream.chunks(chunk_size):
-                        file.write(chunk)
-                        total_bar.update(chunk_size)
+                nbytes = _download_blob_resumable(blob_client, blob, down_path,
+                                                  max_retries, backoff_factor, total_bar, stats)
+                summary["bytes"] += nbytes
+                summary["downloaded"].append(blob.name)
+                if telemetry is not None:
+                    telemetry.record(blob.name, nbytes, time.perf_counter() - blob_start, **stats)
             except Exception as e:
-                print(f"Failed to download {blob.name}: {e}")
+                summary["failed"][blob.name] = str(e)
+                print(f"Failed to download {blob.name}, partial data kept at {part_path} for resume: {e}")
+                if telemetry is not None:
+                    telemetry.record(blob.name, 0, time.perf_counter() - blob_start, error=str(e), **stats)
+
+    summary["seconds"] = time.perf_counter() - start
+    summary["mb_per_s"] = summary["bytes"] / 1024 / 1024 / summary["seconds"] if summary["seconds"] > 0 else 0.0
+    print(f"Transferred {round(summary['bytes']/1024/1024, 2)} MB in {round(summary['seconds'], 2)}s "
+          f"({round(summary['mb_per_s'], 2)} MB/s), {len(summary['failed'])} failed")
+    return summary
+
+def _encode_md5(md5, use_hex=False):
+    """
+    Encode a raw MD5 digest as hex or Base64, returning None when no digest is present.
+    """
+    if not md5:
+        return None
+    return md5.hex() if use_hex else base64.b64encode(md5).decode('utf-8')
 
-def get_blob_md5_checksums(account_url, container, sastoken, blob_list, use_hex=False):
+def get_blob_md5_checksums(account_url, container, sastoken, blob_list, use_hex=False, max_workers=16):
     """
     Retrieves MD5 checksums for a list of blobs in Azure Blob Storage.
 
+    The checksum is read from the listing metadata (``content_settings.content_md5``) that
+    ``list_blob_content`` already returns. Only blobs whose listing has no MD5 fall back to
+    a ``get_blob_properties`` call, and those calls are issued in parallel.
+
     Args:
         account_url (str): The Azure Storage account URL.
         container (str): The name of the container.
         sastoken (str): The SAS token for authentication.
         blob_list (list): List of BlobProperties objects.
         use_hex (bool): If True, returns checksum as hex; otherwise Base64. Default is False.
+        max_workers (int): Maximum number of concurrent property requests for blobs
+                           missing an MD5 in their listing. Default is 16.
 
     Returns:
         dict: A dictionary mapping blob names to their MD5 checksums, or None if not available.
     """
     checksums = {}
-    for blob in tqdm(blob_list, desc="Fetching checksums", unit="file"):
-        blob_client = BlobClient(account_url=account_url, container_name=container,
-                                blob_name=blob.name, credential=sastoken)
-        props = blob_client.get_blob_properties()
-        md5 = props.content_settings.content_md5
-        if md5:
-            checksums[blob.name] = md5.hex() if use_hex else base64.b64encode(md5).decode('utf-8')
-        else:
-            checksums[blob.name] = None
+    missing = []
+    for blob in blob_list:
+        content_settings = getattr(blob, "content_settings", None)
+        md5 = getattr(content_settings, "content_md5", None)
+        checksums[blob.name] = _encode_md5(md5, use_hex)
+        if checksums[blob.name] is None:
+            missing.append(blob.name)
+
+    if not missing:
+        return checksums
+
+    blob_serv_client = BlobServiceClient(account_url=account_url, credential=sastoken)
+    cont_client = blob_serv_client.get_container_client(container)
+
+    def _fetch(blob_name):
+        props = cont_client.get_blob_client(blob_name).get_blob_properties()
+        return blob_name, _encode_md5(props.content_settings.content_md5, use_hex)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_fetch, missing)
+        for blob_name, md5 in tqdm(results, total=len(missing), desc="Fetching checksums", unit="file"):
+            checksums[blob_name] = md5
     return checksums
 
+def verify_blob_checksums(account_url, container, sastoken, blob_list, download_loc,
+                          max_workers=8, chunk_size=8 * 1024 * 1024, preserve_structure=False,
+                          checksum_cache=None):
+    """
+    Verify local copies of blobs against their remote MD5 checksums.
+
+    Remote checksums come from ``get_blob_md5_checksums``. Local MD5s are computed by
+    streaming each file in fixed-size chunks, several files at a time in a thread pool
+    (hashlib releases the GIL while hashing).
+
+    Args:
+        account_url (str): The Azure Storage account URL.
+        container (str): The name of the container.
+        sastoken (str): The SAS token for authentication.
+        blob_list (list): List of BlobProperties objects.
+        download_loc (str): Local directory the blobs were downloaded to.
+        max_workers (int, optional): Number of files hashed concurrently. Defaults to 8.
+        chunk_size (int, optional): Bytes read per chunk while hashing. Defaults to 8 MB.
+        preserve_structure (bool, optional): Whether the blobs were downloaded with their
+                                 folder hierarchy mirrored. Defaults to False.
+        checksum_cache (fileio.ChecksumCache, optional): An MD5 checksum cache, so only local
+                                 files that are new or modified since the last run are hashed.
+                                 Defaults to None.
+
+    Returns:
+        dict: A dictionary with the keys:
+
+            - ``matched``: blob names whose local MD5 matches the remote MD5
+            - ``mismatched``: list of (blob name, local MD5, remote MD5) tuples
+            - ``missing_local``: blob names with no local file
+            - ``no_remote_md5``: blob names without a remote MD5 to compare against
+
+    Note:
+        Local files are expected where ``get_local_blob_path`` places them, as written by
+        ``download_all_blobs``.
+    """
+    blob_list = list(blob_list)
+    remote = get_blob_md5_checksums(account_url, container, sastoken, blob_list, use_hex=True)
+
+    report = {"matched": [], "mismatched": [], "missing_local": [], "no_remote_md5": []}
+    to_hash = {}
+    for blob in blob_list:
+        local_path = get_local_blob_path(download_loc, blob.name, preserve_structure)
+        if remote[blob.name] is None:
+            report["no_remote_md5"].append(blob.name)
+        elif not os.path.isfile(local_path):
+            report["missing_local"].append(blob.name)
+        else:
+            to_hash[blob.name] = local_path
+
+    def _compare(blob_name, local_md5):
+        if local_md5 == remote[blob_name]:
+            report["matched"].append(blob_name)
+        else:
+            report["mismatched"].append((blob_name, local_md5, remote[blob_name]))
+
+    if checksum_cache is not None:
+        if checksum_cache.algorithm != "md5":
+            raise ValueError("checksum_cache must use the md5 algorithm to compare with blob MD5s")
+        local = checksum_cache.get_checksums(list(to_hash.values()), max_workers, chunk_size)
+        for blob_name, local_path in to_hash.items():
+            _compare(blob_name, local[local_path])
+    else:
+        def _hash(blob_name):
+            return blob_name, fileio.calculate_file_checksum(to_hash[blob_name], "md5", chunk_size)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(_hash, to_hash)
+            for blob_name, local_md5 in tqdm(results, total=len(to_hash), desc="Verifying checksums", unit="file"):
+                _compare(blob_name, local_md5)
+
+    print(f"Checksums matched: {len(report['matched'])}, mismatched: {len(report['mismatched'])}, "
+          f"missing locally: {len(report['missing_local'])}, no remote MD5: {len(report['no_remote_md5'])}")
+    return report
+
+class _FileLock:
+    """
+    Exclusive inter-process lock held on a lock file for the duration of a with block.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "a+b")
+        if os.name == "nt":
+            import msvcrt
+            while True:
+                try:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ~10 seconds, keep waiting
+                    continue
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if os.name == "nt":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+class BlobCache:
+    """
+    Local disk cache of blob content, keyed by account, container, blob name and etag.
+
+    A cached blob is revalidated with a single ``get_blob_properties`` call (comparing etags)
+    before it is served, or served with no network call at all while it is younger than ``ttl``.
+    The cache is capped at ``max_bytes``; the least recently used blobs are evicted first.
+    An index database and a lock file in ``cache_dir`` make the cache safe to share between
+    processes, such as several notebooks on one machine.
+
+    Args:
+        cache_dir (str): Directory holding the cached content and its index. Created if missing.
+        max_bytes (int, optional): Size cap for cached content in bytes. Defaults to 5 GB.
+        ttl (float, optional): Seconds a cached blob is trusted without revalidation.
+                               Defaults to None (always revalidate).
+
+    Example:
+        >>> cache = BlobCache("~/.blobcache", max_bytes=2 * 1024**3, ttl=3600)
+        >>> path = cache.fetch(account_url, "reference", "postcodes/postcodes.parquet", sastoken)
+    """
+    def __init__(self, cache_dir, max_bytes=5 * 1024 ** 3, ttl=None):
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(os.path.join(self.cache_dir, "content"), exist_ok=True)
+        self._index_path = os.path.join(self.cache_dir, "index.sqlite")
+        self._lock_path = os.path.join(self.cache_dir, "cache.lock")
+        with self._lock(), self._connect() as con:
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    container TEXT,
+                    blob_name TEXT,
+                    etag TEXT,
+                    path TEXT,
+                    size INTEGER,
+                    fetched REAL,
+                    last_access REAL
+                )
+            """)
+
+    def _lock(self):
+        return _FileLock(self._lock_path)
+
+    def _connect(self):
+        return fileio.sqlite_connection(self._index_path)
+
+    @staticmethod
+    def _key(account_url, container, blob_name):
+        return hashlib.sha256(f"{account_url.rstrip('/')}|{container}|{blob_name}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, key):
+        with self._connect() as con:
+            return con.execute("SELECT etag, path, fetched FROM entries WHERE key = ?", (key,)).fetchone()
+
+    def _touch(self, key, now, refetched=False):
+        with self._connect() as con:
+            if refetched:
+                con.execute("UPDATE entries SET last_access = ?, fetched = ? WHERE key = ?", (now, now, key))
+            else:
+                con.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+
+    def fetch(self, account_url, container, blob_name, sastoken):
+        """
+        Return the local path of a blob's content, downloading it only when needed.
+
+        Args:
+            account_url (str): The Azure Storage account URL.
+            container (str): The name of the container.
+            blob_name (str): The full name of the blob.
+            sastoken (str): The SAS token for authentication.
+
+        Returns:
+            str: Path to a local file holding the blob's current content.
+        """
+        key = self._key(account_url, container, blob_name)
+        now = time.time()
+        entry = self._lookup(key)
+        if entry and os.path.exists(entry[1]) and self.ttl is not None and now - entry[2] < self.ttl:
+            self._touch(key, now)
+            return entry[1]
+
+        blob_client = BlobClient(account_url=account_url, container_name=container,
+                                 blob_name=blob_name, credential=sastoken)
+        etag = blob_client.get_blob_properties().etag
+        if entry and entry[0] == etag and os.path.exists(entry[1]):
+            self._touch(key, now, refetched=True)
+            return entry[1]
+
+        path = os.path.join(self.cache_dir, "content", f"{key}.{etag.strip(chr(34))}")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as file:
+                blob_client.download_blob(etag=etag, match_condition=MatchConditions.IfNotModified).readinto(file)
+            size = os.path.getsize(tmp_path)
+            with self._lock():
+                os.replace(tmp_path, path)
+                with self._connect() as con:
+                    con.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                (key, container, blob_name, etag, path, size, now, now))
+                if entry and entry[1] != path:
+                    self._remove_file(entry[1])
+                self._evict(keep=key)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+    def read_bytes(self, account_url, container, blob_name, sastoken):
+        """
+        Return a blob's content as bytes, served from the cache where possible.
+        """
+        with open(self.fetch(account_url, container, blob_name, sastoken), "rb") as file:
+            return file.read()
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except OSError:
+            # already gone, or still open elsewhere on Windows
+            pass
+
+    def _evict(self, keep=None):
+        """
+        Remove least recently used entries until the cache is within max_bytes. Caller holds the lock.
+        """
+        with self._connect() as con:
+            total = con.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for key, path, size in con.execute("SELECT key, path, size FROM entries WHERE key != ? "
+                                               "ORDER BY last_access", (keep or "",)).fetchall():
+                self._remove_file(path)
+                con.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def total_size(self):
+        """
+        Return the number of bytes of blob content currently cached.
+        """
+        with self._connect() as con:
+            return con.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def invalidate(self, account_url, container, blob_name):
+        """
+        Drop a single blob from the cache.
+        """
+        key = self._key(account_url, container, blob_name)
+        with self._lock(), self._connect() as con:
+            row = con.execute("SELECT path FROM entries WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._remove_file(row[0])
+                con.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        """
+        Remove every cached blob.
+        """
+        with self._lock(), self._connect() as con:
+            for (path,) in con.execute("SELECT path FROM entries").fetchall():
+                self._remove_file(path)
+            con.execute("DELETE FROM entries")
+
 # def test3():
 #     """
 #     Test suite for chunked blob downloads using Azure Storage Emulator or a test account.
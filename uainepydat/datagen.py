@@ -1,10 +1,108 @@
 import numpy as np
 import pandas as pd
 import string
-import random
+import pyarrow as pa
+import pyarrow.compute as pc
 from datetime import datetime, timedelta
 from typing import List, Union, Callable, Optional, Tuple
 
+# Characters drawn for each gen_string_column pattern class
+STRING_PATTERN_CLASSES = {
+    'L': string.ascii_uppercase,
+    'l': string.ascii_lowercase,
+    'd': string.digits,
+    'c': string.punctuation,
+    'a': string.ascii_letters + string.digits,
+}
+
+# Rows generated per Arrow chunk by gen_string_column, bounding the size of the intermediate arrays
+STRING_CHUNK_ROWS = 1_000_000
+
+def _ascii_codes(chars: str) -> np.ndarray:
+    """
+    Return the characters of an ASCII string as a uint8 array.
+    """
+    return np.frombuffer(chars.encode("ascii"), dtype=np.uint8)
+
+def _byte_rows_to_arrow(rows: np.ndarray, valid: np.ndarray, keep: np.ndarray = None) -> pa.Array:
+    """
+    Pack each row of a uint8 matrix into one UTF-8 string of an Arrow large_string array.
+
+    Args:
+        rows (np.ndarray): (n, width) matrix of UTF-8 bytes.
+        valid (np.ndarray): Boolean mask of the non-null rows.
+        keep (np.ndarray, optional): Boolean matrix of the bytes to keep. Defaults to every byte.
+
+    Returns:
+        pa.Array: The strings.
+    """
+    size, width = rows.shape
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    if keep is None:
+        offsets[1:] = np.arange(1, size + 1, dtype=np.int64) * width
+        data = rows.ravel()
+    else:
+        np.cumsum(keep.sum(axis=1), out=offsets[1:])
+        data = rows[keep]
+    null_count = int(size - np.count_nonzero(valid))
+    validity = pa.py_buffer(np.packbits(valid, bitorder="little")) if null_count else None
+    return pa.Array.from_buffers(pa.large_string(), size,
+                                 [validity, pa.py_buffer(offsets), pa.py_buffer(np.ascontiguousarray(data))],
+                                 null_count=null_count)
+
+def _gen_pattern_chunk(size: int, pattern: str, prefix: str, suffix: str, valid: np.ndarray) -> pa.Array:
+    """
+    Generate one chunk of pattern strings, drawing every position of a character class at once.
+    """
+    head, tail = prefix.encode("utf-8"), suffix.encode("utf-8")
+    classes = {}
+    literals = []
+    position = len(head)
+    for char in pattern:
+        if char in STRING_PATTERN_CLASSES:
+            classes.setdefault(char, []).append(position)
+            position += 1
+        else:
+            literals.append((position, char.encode("utf-8")))
+            position += len(literals[-1][1])
+
+    rows = np.empty((size, position + len(tail)), dtype=np.uint8)
+    rows[:, :len(head)] = np.frombuffer(head, dtype=np.uint8)
+    rows[:, position:] = np.frombuffer(tail, dtype=np.uint8)
+    for start, encoded in literals:
+        rows[:, start:start + len(encoded)] = np.frombuffer(encoded, dtype=np.uint8)
+    for char, positions in classes.items():
+        codes = _ascii_codes(STRING_PATTERN_CLASSES[char])
+        rows[:, positions] = codes[np.random.randint(0, len(codes), size=(size, len(positions)))]
+    return _byte_rows_to_arrow(rows, valid)
+
+def _gen_charset_chunk(size: int, lengths: np.ndarray, charset: str, prefix: str, suffix: str,
+                       valid: np.ndarray) -> pa.Array:
+    """
+    Generate one chunk of random strings of the given lengths from a charset.
+    """
+    max_length = int(lengths.max()) if size else 0
+    if not charset.isascii():
+        # Multi-byte characters: draw fixed-width unicode rows and let trailing NULs end each string
+        width = max(max_length, 1)
+        chars = np.array(list(charset))[np.random.randint(0, len(charset), size=(size, width))]
+        chars[np.arange(width) >= lengths[:, None]] = ""
+        body = pa.array(chars.view(f"<U{width}").ravel(), type=pa.large_string(), mask=~valid)
+        affixes = [pa.scalar(value, type=pa.large_string()) for value in (prefix, suffix, "")]
+        return pc.binary_join_element_wise(affixes[0], body, affixes[1], affixes[2])
+
+    head, tail = prefix.encode("utf-8"), suffix.encode("utf-8")
+    codes = _ascii_codes(charset)
+    rows = np.empty((size, len(head) + max_length + len(tail)), dtype=np.uint8)
+    rows[:, :len(head)] = np.frombuffer(head, dtype=np.uint8)
+    rows[:, len(head):len(head) + max_length] = codes[np.random.randint(0, len(codes), size=(size, max_length))]
+    rows[:, len(head) + max_length:] = np.frombuffer(tail, dtype=np.uint8)
+    if (lengths == max_length).all():
+        return _byte_rows_to_arrow(rows, valid)
+    columns = np.arange(rows.shape[1])
+    keep = (columns < len(head) + lengths[:, None]) | (columns >= len(head) + max_length)
+    return _byte_rows_to_arrow(rows, valid, keep)
+
 def gen_string_column(
     size: int, 
     length: Union[int, Tuple[int, int]] = 10, 
@@ -17,6 +115,10 @@ def gen_string_column(
     """
     Generate a pandas Series of random strings.
 
+    Strings are generated with NumPy, STRING_CHUNK_ROWS rows at a time: the random
+    characters for all rows are drawn as one array per character class and packed
+    directly into Arrow string buffers, so no Python string is built per row.
+
     Parameters:
     -----------
     size: int
@@ -50,7 +152,8 @@ def gen_string_column(
     Returns:
     --------
     pd.Series
-        Series of randomly generated strings
+        Series of randomly generated strings in pandas' default string dtype, as for the other
+        generated string columns: ``str`` under pandas 3 (Arrow-backed, nulls as NaN)
     """
     if charset is None:
         charset = string.ascii_lowercase
@@ -58,44 +161,23 @@ def gen_string_column(
     # Determine if we're using fixed or variable length
     variable_length = isinstance(length, tuple) and len(length) == 2
     
-    # Generate strings according to pattern or random characters
-    result = []
-    for _ in range(size):
-        # Decide if this should be a null value
-        if random.random() < null_prob:
-            result.append(None)
-            continue
-            
+    chunks = []
+    for start in range(0, size, STRING_CHUNK_ROWS):
+        chunk_size = min(STRING_CHUNK_ROWS, size - start)
+        # Decide which values are null
+        valid = np.random.random(chunk_size) >= null_prob
+
         if pattern:
-            # Generate string based on the pattern
-            s = ""
-            for char in pattern:
-                if char == 'L':
-                    s += random.choice(string.ascii_uppercase)
-                elif char == 'l':
-                    s += random.choice(string.ascii_lowercase)
-                elif char == 'd':
-                    s += random.choice(string.digits)
-                elif char == 'c':
-                    s += random.choice(string.punctuation)
-                elif char == 'a':
-                    s += random.choice(string.ascii_letters + string.digits)
-                else:
-                    s += char  # Use the character as-is
+            chunks.append(_gen_pattern_chunk(chunk_size, pattern, prefix, suffix, valid))
         else:
-            # Generate random string of specified length
             if variable_length:
-                str_length = random.randint(length[0], length[1])
+                lengths = np.random.randint(length[0], length[1] + 1, size=chunk_size)
             else:
-                str_length = length
-                
-            s = ''.join(random.choice(charset) for _ in range(str_length))
-            
-        # Add prefix and suffix
-        s = prefix + s + suffix
-        result.append(s)
-        
-    return pd.Series(result)
+                lengths = np.full(chunk_size, length)
+            chunks.append(_gen_charset_chunk(chunk_size, lengths, charset, prefix, suffix, valid))
+
+    # to_pandas converts to the default string dtype, so nulls match the other generated columns
+    return pa.chunked_array(chunks, type=pa.large_string()).to_pandas()
 
 def gen_numeric_column(
     size: int, 
@@ -1,6 +1,104 @@
-import hmac
+import os
 import hashlib
 import secrets
+import functools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+
+class KeyedHasher:
+    """
+    Reusable HMAC hasher with the keyed inner and outer hash states computed once.
+
+    ``hmac.new`` pads the key and hashes a block for each of the inner and outer hashes on
+    every call. Here both keyed states are built once and copied per value, giving the same
+    digests as ``hmac.new(key, value, method)`` at a fraction of the cost. Hashers can be
+    pickled (by key), so ``hash_many`` can spread chunks over a process pool.
+
+    Args:
+        key (bytes): The HMAC key (str is UTF-8 encoded).
+        method: The hashing method, a hashlib constructor or name (default is hashlib.sha256).
+
+    Example:
+        >>> hasher = KeyedHasher(b"secret")
+        >>> tokens = hasher.hash_many(ids)
+    """
+    def __init__(self, key, method=hashlib.sha256):
+        self.key = key.encode('utf-8') if isinstance(key, str) else bytes(key)
+        self.method = method
+        new = (lambda data=b"": hashlib.new(method, data)) if isinstance(method, str) else method
+        inner = new()
+        key = self.key
+        if len(key) > inner.block_size:
+            key = new(key).digest()
+        key = key.ljust(inner.block_size, b"\0")
+        inner.update(bytes(b ^ 0x36 for b in key))
+        outer = new()
+        outer.update(bytes(b ^ 0x5c for b in key))
+        self._inner = inner
+        self._outer = outer
+
+    def __reduce__(self):
+        return (KeyedHasher, (self.key, self.method))
+
+    def hexdigest(self, datastr: str) -> str:
+        """
+        Return the hexadecimal HMAC digest of one string.
+        """
+        inner = self._inner.copy()
+        inner.update(datastr.encode('utf-8'))
+        outer = self._outer.copy()
+        outer.update(inner.digest())
+        return outer.hexdigest()
+
+    def _hash_list(self, values: list) -> list:
+        inner_copy = self._inner.copy
+        outer_copy = self._outer.copy
+        hashed = []
+        append = hashed.append
+        for value in values:
+            if value is None:
+                append(None)
+                continue
+            inner = inner_copy()
+            inner.update(value.encode('utf-8'))
+            outer = outer_copy()
+            outer.update(inner.digest())
+            append(outer.hexdigest())
+        return hashed
+
+    def hash_many(self, values, max_workers: int = None, chunk_size: int = 100_000,
+                  use_processes: bool = True) -> list:
+        """
+        Hash a list or array of strings, optionally in parallel chunks. None values stay None.
+
+        Args:
+            values: A list, tuple or array of strings.
+            max_workers (int, optional): Number of workers. Defaults to the number of CPUs.
+            chunk_size (int): Values per chunk. Inputs no longer than this, or any input when
+                there is a single worker, are hashed in the calling process. Default is 100,000.
+            use_processes (bool): Use a process pool rather than a thread pool. Default is True.
+
+        Returns:
+            list: The hexadecimal digests.
+        """
+        values = list(values)
+        max_workers = max_workers or os.cpu_count() or 1
+        if len(values) <= chunk_size or max_workers == 1:
+            return self._hash_list(values)
+        chunks = [values[start:start + chunk_size] for start in range(0, len(values), chunk_size)]
+        pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with pool(max_workers=max_workers) as executor:
+            return [digest for chunk in executor.map(self._hash_list, chunks) for digest in chunk]
+
+@functools.lru_cache(maxsize=32)
+def _keyed_hasher(key: bytes, method) -> KeyedHasher:
+    """
+    Return a cached KeyedHasher for a key, so repeated scalar calls reuse its keyed state.
+    """
+    return KeyedHasher(key, method)
 
 # Function to create an HMAC hash
 def hashhmac(datastr: str, sha_salt: bytes, method=hashlib.sha256) -> str:
@@ -15,10 +113,8 @@ def hashhmac(datastr: str, sha_salt: bytes, method=hashlib.sha256) -> str:
     Returns:
         str: The hexadecimal digest of the HMAC hash.
     """
-    # Create a new HMAC object using the provided data, salt, and method
-    hmac_object = hmac.new(sha_salt, datastr.encode('utf-8'), method)
-    # Return the hexadecimal digest of the HMAC object
-    return hmac_object.hexdigest()
+    # Reuse the keyed inner/outer state for this salt instead of rebuilding it per call
+    return _keyed_hasher(bytes(sha_salt), method).hexdigest(datastr)
 
 # Function to create a SHA-256 hash
 def hash256(datastr: str, sha_salt: str) -> str:
@@ -73,6 +169,301 @@ def hashmd5(datastr: str, sha_salt: str) -> str:
     md5_hash = hashlib.md5(combined_data).hexdigest()
     return md5_hash
 
+# Salted hashing schemes supported by hash_column and hash_frame
+HASH_METHODS = ("sha256", "hmac", "md5")
+
+def _hash_chunk(values: list, method: str, salt) -> list:
+    """
+    Hash a list of strings exactly as hash256, hashhmac or hashmd5 would, passing None through.
+    """
+    if method == "sha256":
+        sha256 = hashlib.sha256
+        return [None if value is None else sha256((value + salt).encode('utf-8')).hexdigest() for value in values]
+    if method == "md5":
+        md5 = hashlib.md5
+        return [None if value is None else md5((salt + value).encode('utf-8')).hexdigest() for value in values]
+    key = salt.encode('utf-8') if isinstance(salt, str) else salt
+    return _keyed_hasher(bytes(key), hashlib.sha256)._hash_list(values)
+
+def _column_values(column) -> list:
+    """
+    Extract a pandas, Polars or Arrow column as a list of strings, with None for nulls.
+    """
+    if isinstance(column, pd.Series):
+        values = column.to_numpy(dtype=object)
+        nulls = pd.isna(column).to_numpy()
+        return [None if null else value if isinstance(value, str) else str(value)
+                for value, null in zip(values, nulls)]
+    if isinstance(column, pl.Series):
+        values = column.to_list()
+    elif isinstance(column, (pa.Array, pa.ChunkedArray)):
+        values = column.to_pylist()
+    else:
+        values = list(column)
+    return [None if value is None else value if isinstance(value, str) else str(value) for value in values]
+
+def _factorize_column(column) -> tuple:
+    """
+    Split a column into integer codes (-1 for nulls) and a list of its unique values as strings.
+    """
+    if isinstance(column, pd.Series):
+        codes, uniques = pd.factorize(column, use_na_sentinel=True)
+        uniques = list(uniques)
+    else:
+        if isinstance(column, pl.Series):
+            column = column.to_arrow()
+        elif not isinstance(column, (pa.Array, pa.ChunkedArray)):
+            column = pa.array(list(column))
+        if isinstance(column, pa.ChunkedArray):
+            column = column.combine_chunks()
+        encoded = column.dictionary_encode()
+        # dictionary inputs (Polars Categorical, DictionaryArray) may have unsigned indices
+        codes = encoded.indices.cast(pa.int64()).fill_null(-1).to_numpy(zero_copy_only=False)
+        uniques = encoded.dictionary.to_pylist()
+    return codes, [value if isinstance(value, str) else str(value) for value in uniques]
+
+def _hash_values(values: list, method: str, salt, max_workers: int, chunk_size: int, use_processes: bool) -> list:
+    """
+    Hash a list of strings in parallel chunks, or inline when there is one worker or one chunk.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if len(values) <= chunk_size or max_workers == 1:
+        return _hash_chunk(values, method, salt)
+    chunks = [values[start:start + chunk_size] for start in range(0, len(values), chunk_size)]
+    pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with pool(max_workers=max_workers) as executor:
+        return [digest for chunk in executor.map(_hash_chunk, chunks, [method] * len(chunks), [salt] * len(chunks))
+                for digest in chunk]
+
+def hash_column(column, method: str = "sha256", salt="", max_workers: int = None,
+                chunk_size: int = 100_000, use_processes: bool = True, factorize: bool = False):
+    """
+    Hash every value of a column with hash256, hashhmac or hashmd5.
+
+    The column is split into chunks of ``chunk_size`` values which are hashed in parallel,
+    by default in a process pool as hashlib holds the GIL for short strings. Each value is
+    hashed exactly as the scalar function would hash it, so results are identical to
+    ``column.apply(lambda v: hash256(v, salt))``. Non-string values are hashed as ``str(value)``
+    and nulls stay null.
+
+    With ``factorize`` the column is first encoded as codes and unique values
+    (``pd.factorize`` or Arrow ``dictionary_encode``), only the unique values are hashed,
+    and the digests are scattered back by code. For ID columns with many repeats this
+    reduces the work to the number of distinct values.
+
+    Args:
+        column: A pandas Series, Polars Series, or pyarrow Array/ChunkedArray.
+        method (str): 'sha256' (hash256), 'hmac' (hashhmac with SHA-256) or 'md5' (hashmd5).
+            Default is 'sha256'.
+        salt (str or bytes): The salt, or for 'hmac' the key (str is UTF-8 encoded).
+        max_workers (int, optional): Number of workers. Defaults to the number of CPUs.
+        chunk_size (int): Values per chunk. Columns no longer than this, or any column when
+            there is a single worker, are hashed in the calling process. Default is 100,000.
+        use_processes (bool): Use a process pool rather than a thread pool. Default is True.
+        factorize (bool): Hash only the distinct values. Default is False.
+
+    Returns:
+        The hexadecimal digests, as the same kind of column as the input.
+    """
+    if method not in HASH_METHODS:
+        raise ValueError(f"method must be one of {HASH_METHODS}")
+    if factorize:
+        codes, uniques = _factorize_column(column)
+        # code -1 (null) picks the trailing None
+        digests = np.array(_hash_values(uniques, method, salt, max_workers, chunk_size, use_processes) + [None],
+                           dtype=object)
+        hashed = digests[codes].tolist()
+    else:
+        hashed = _hash_values(_column_values(column), method, salt, max_workers, chunk_size, use_processes)
+
+    if isinstance(column, pd.Series):
+        return pd.Series(hashed, index=column.index, name=column.name, dtype=object)
+    if isinstance(column, pl.Series):
+        return pl.Series(column.name, hashed, dtype=pl.String)
+    if isinstance(column, (pa.Array, pa.ChunkedArray)):
+        return pa.array(hashed, type=pa.string())
+    return hashed
+
+def hash_frame(df, columns: list, method: str = "sha256", salt="", max_workers: int = None,
+               chunk_size: int = 100_000, use_processes: bool = True, factorize: bool = False):
+    """
+    Replace columns of a pandas DataFrame, Polars DataFrame or pyarrow Table with their hashes.
+
+    Each column is hashed with ``hash_column`` using the same arguments.
+
+    Args:
+        df: The pandas DataFrame, Polars DataFrame or pyarrow Table.
+        columns (list): Names of the columns to hash.
+        method (str): 'sha256', 'hmac' or 'md5'. Default is 'sha256'.
+        salt (str or bytes): The salt, or for 'hmac' the key.
+        max_workers (int, optional): Number of workers. Defaults to the number of CPUs.
+        chunk_size (int): Values per chunk. Default is 100,000.
+        use_processes (bool): Use a process pool rather than a thread pool. Default is True.
+        factorize (bool): Hash only the distinct values of each column. Default is False.
+
+    Returns:
+        A copy of the frame with the columns hashed.
+    """
+    kwargs = dict(method=method, salt=salt, max_workers=max_workers, chunk_size=chunk_size,
+                  use_processes=use_processes, factorize=factorize)
+    if isinstance(df, pa.Table):
+        for col in columns:
+            df = df.set_column(df.schema.get_field_index(col), col, hash_column(df[col], **kwargs))
+        return df
+    if isinstance(df, pl.DataFrame):
+        return df.with_columns([hash_column(df[col], **kwargs) for col in columns])
+    df = df.copy()
+    for col in columns:
+        df[col] = hash_column(df[col], **kwargs)
+    return df
+
+def cached_hasher(method: str = "sha256", salt="", maxsize: int = 1_000_000):
+    """
+    Return a scalar hash function for one scheme and salt, memoised in a bounded LRU cache.
+
+    Useful where values are hashed one at a time (e.g. ``Series.map`` or a record-by-record
+    service) and the same identifiers recur. Results equal hash256, hashhmac and hashmd5.
+
+    Args:
+        method (str): 'sha256', 'hmac' or 'md5'. Default is 'sha256'.
+        salt (str or bytes): The salt, or for 'hmac' the key (str is UTF-8 encoded).
+        maxsize (int): Maximum number of cached digests. Default is 1,000,000.
+
+    Returns:
+        callable: A function taking a string and returning its hexadecimal digest, with the
+        ``cache_info`` and ``cache_clear`` methods of ``functools.lru_cache``.
+
+    Example:
+        >>> hash_id = cached_hasher("hmac", key)
+        >>> df["customer_id"] = df["customer_id"].map(hash_id)
+    """
+    if method not in HASH_METHODS:
+        raise ValueError(f"method must be one of {HASH_METHODS}")
+    if method == "sha256":
+        func = functools.partial(hash256, sha_salt=salt)
+    elif method == "md5":
+        func = functools.partial(hashmd5, sha_salt=salt)
+    else:
+        func = KeyedHasher(salt).hexdigest
+    return functools.lru_cache(maxsize=maxsize)(func)
+
+def hash_expr(column, method: str = "sha256", salt=""):
+    """
+    Build a Polars expression hashing a column with hash256, hashhmac or hashmd5.
+
+    Polars has no salted cryptographic hash of its own, so each batch Polars passes to the
+    expression is hashed with ``hash_column``. The expression is elementwise, so it can be
+    used in ``select``/``with_columns`` and in lazy and streaming queries.
+
+    Args:
+        column (str or polars.Expr): The column name or expression to hash.
+        method (str): 'sha256', 'hmac' or 'md5'. Default is 'sha256'.
+        salt (str or bytes): The salt, or for 'hmac' the key.
+
+    Returns:
+        polars.Expr: An expression producing the hexadecimal digests.
+
+    Example:
+        >>> df.with_columns(hash_expr("person_id", "hmac", key).alias("person_id"))
+    """
+    if method not in HASH_METHODS:
+        raise ValueError(f"method must be one of {HASH_METHODS}")
+    expr = pl.col(column) if isinstance(column, str) else column
+    return expr.cast(pl.String).map_batches(lambda series: hash_column(series, method, salt, max_workers=1),
+                                            return_dtype=pl.String, is_elementwise=True)
+
+# Multiplier for combining per-column row hashes (the 64-bit golden ratio)
+FINGERPRINT_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+def _iter_frame_chunks(data, chunk_size: int):
+    """
+    Yield pandas DataFrame chunks from a frame, Arrow table/reader or an iterator of any of these.
+    """
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, max(len(data), 1), chunk_size):
+            yield data.iloc[start:start + chunk_size]
+    elif isinstance(data, pl.DataFrame):
+        for start in range(0, max(data.height, 1), chunk_size):
+            yield data.slice(start, chunk_size).to_pandas()
+    elif isinstance(data, pa.Table):
+        for start in range(0, max(data.num_rows, 1), chunk_size):
+            yield data.slice(start, chunk_size).to_pandas()
+    elif isinstance(data, pa.RecordBatch):
+        yield data.to_pandas()
+    else:
+        # an iterator of chunks (or a RecordBatchReader): each chunk is one partition
+        for chunk in data:
+            yield next(_iter_frame_chunks(chunk, len(chunk) or 1))
+
+def _row_hashes(chunk: pd.DataFrame, executor) -> np.ndarray:
+    """
+    Hash each column of a chunk in parallel and combine them into one uint64 per row.
+    """
+    columns = executor.map(lambda col: pd.util.hash_pandas_object(chunk[col], index=False).to_numpy(),
+                           chunk.columns)
+    hashes = np.zeros(len(chunk), dtype=np.uint64)
+    for column_hash in columns:
+        hashes = hashes * FINGERPRINT_MULTIPLIER + column_hash
+    return hashes
+
+def fingerprint_frame(data, order_sensitive: bool = True, chunk_size: int = 1_000_000,
+                      max_workers: int = None) -> dict:
+    """
+    Compute a content digest of a frame for change detection, plus one digest per partition.
+
+    Each column of each chunk is hashed with ``pd.util.hash_pandas_object`` (columns in
+    parallel) and the column hashes are combined into a 64-bit hash per row. An
+    order-sensitive partition digest is the BLAKE2b of its row hashes in order; an
+    order-insensitive one is the BLAKE2b of two wrapping sums of the row hashes, so the
+    overall digest is then also independent of how rows are split into partitions. Column
+    names and dtypes are part of every digest.
+
+    Chunks are processed one at a time, so an iterator of chunks (e.g. a RecordBatchReader
+    or ``pd.read_csv(..., chunksize=...)``) is fingerprinted without being held in memory.
+    Digests are only comparable between inputs of the same frame type and partitioning;
+    compare ``partitions`` between loads to find the ones that changed.
+
+    Args:
+        data: A pandas or Polars DataFrame, a pyarrow Table, RecordBatch or RecordBatchReader,
+            or an iterator of chunks, each of which becomes one partition.
+        order_sensitive (bool): Whether row order affects the digest. Default is True.
+        chunk_size (int): Rows per partition when a single frame is given. Default is 1,000,000.
+        max_workers (int, optional): Threads hashing columns in parallel. Defaults to the number of CPUs.
+
+    Returns:
+        dict: ``digest`` (hex), ``partitions`` (list of hex digests), ``rows`` and ``order_sensitive``.
+    """
+    overall = hashlib.blake2b(digest_size=32)
+    total = np.zeros(2, dtype=np.uint64)
+    partitions = []
+    rows = 0
+    schema = None
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        for chunk in _iter_frame_chunks(data, chunk_size):
+            chunk_schema = repr([(str(col), str(dtype)) for col, dtype in chunk.dtypes.items()]).encode('utf-8')
+            if schema is None:
+                schema = chunk_schema
+                overall.update(schema)
+            hashes = _row_hashes(chunk, executor)
+            rows += len(hashes)
+            partition = hashlib.blake2b(chunk_schema, digest_size=32)
+            if order_sensitive:
+                partition.update(hashes.tobytes())
+            else:
+                mixed = (hashes ^ (hashes >> np.uint64(31))) * FINGERPRINT_MULTIPLIER
+                sums = np.array([hashes.sum(dtype=np.uint64), mixed.sum(dtype=np.uint64)], dtype=np.uint64)
+                total += sums
+                partition.update(sums.tobytes())
+            partition.update(len(hashes).to_bytes(8, 'little'))
+            partitions.append(partition.hexdigest())
+            if order_sensitive:
+                overall.update(bytes.fromhex(partitions[-1]))
+    if not order_sensitive:
+        overall.update(total.tobytes())
+        overall.update(rows.to_bytes(8, 'little'))
+    return {"digest": overall.hexdigest(), "partitions": partitions, "rows": rows,
+            "order_sensitive": order_sensitive}
+
 # Test executions
 # if __name__ == "__main__":
 #     # Test data
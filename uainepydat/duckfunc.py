@@ -1,8 +1,164 @@
 import os
+import re
 import sys
+import glob
+import time
+import json
+import uuid
+import hashlib
+import tempfile
+import weakref
+import threading
 from datetime import datetime
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import duckdb
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pandas import DataFrame
 from uainepydat import dataio
+from uainepydat import datahash
+from uainepydat import fileio
+from uainepydat import systeminfo
+
+def get_spill_directory() -> str:
+    """
+    Choose a directory for DuckDB to spill to, on the writable drive with the most free space.
+
+    The system temp directory is used when it already lives on that drive.
+
+    Returns:
+        str: Path of a ``duckdb_spill`` directory (not created here).
+    """
+    mount = systeminfo.get_largest_writable_mountpoint()
+    tmp = tempfile.gettempdir()
+    if mount is None or os.stat(mount).st_dev == os.stat(tmp).st_dev:
+        return os.path.join(tmp, "duckdb_spill")
+    return os.path.join(mount, "duckdb_spill")
+
+def recommend_duck_settings(memory_fraction: float = 0.75, preserve_insertion_order: bool = False) -> dict:
+    """
+    Size DuckDB's resource settings from the machine it is running on.
+
+    * ``threads``: the number of physical cores (hyperthreads add little to DuckDB scans)
+    * ``memory_limit``: a fraction of the currently free RAM, leaving headroom for Python
+    * ``temp_directory``: a spill directory on the drive with the most free space
+    * ``preserve_insertion_order``: off by default, which lets large queries stream and spill
+
+    Args:
+        memory_fraction (float): Fraction of free RAM to allow DuckDB. Default is 0.75.
+        preserve_insertion_order (bool): Whether results must keep insertion order. Default is False.
+
+    Returns:
+        dict: Settings suitable for ``duckdb.connect(config=...)`` or ``apply_duck_settings``.
+    """
+    threads = systeminfo.get_physical_cores() or systeminfo.get_number_virtual_cores()
+    memory_mb = int(systeminfo.get_free_ram() * memory_fraction / (1024 * 1024))
+    return {
+        "threads": threads,
+        "memory_limit": f"{memory_mb}MB",
+        "temp_directory": get_spill_directory(),
+        "preserve_insertion_order": preserve_insertion_order,
+    }
+
+def apply_duck_settings(con, settings: dict):
+    """
+    Apply settings such as those from ``recommend_duck_settings`` to an open connection.
+
+    Args:
+        con: The database connection object.
+        settings (dict): Setting name to value.
+
+    Returns:
+        None
+    """
+    for name, value in settings.items():
+        if not re.fullmatch(r"[A-Za-z_]+", name):
+            raise ValueError(f"Invalid setting name {name}")
+        con.execute(f"SET {name} = {_sql_literal(value)}")
+
+class DuckConnectionManager:
+    """
+    Owns a tuned DuckDB connection and hands out one cursor per thread.
+
+    The connection is configured from ``recommend_duck_settings`` (threads, memory limit,
+    spill directory and insertion order), with any ``settings`` given overriding those values.
+    DuckDB connections must not be shared between threads, so ``cursor()`` returns a cursor
+    dedicated to the calling thread, making the manager safe to use from a thread pool.
+
+    Args:
+        database (str): Path of the database file, or ':memory:'. Default is ':memory:'.
+        settings (dict, optional): Settings overriding the recommended ones.
+        read_only (bool): Open the main database read only. Default is False.
+        attach (dict, optional): Alias to database path of databases to attach on open.
+
+    Example:
+        >>> with DuckConnectionManager("warehouse.duckdb", attach={"ref": "reference.duckdb"}) as manager:
+        ...     with ThreadPoolExecutor() as pool:
+        ...         pool.map(lambda t: manager.cursor().sql(f"SELECT COUNT(*) FROM {t}").fetchone(), tables)
+    """
+    def __init__(self, database: str = ":memory:", settings: dict = None, read_only: bool = False,
+                 attach: dict = None):
+        self.settings = recommend_duck_settings()
+        self.settings.update(settings or {})
+        os.makedirs(self.settings["temp_directory"], exist_ok=True)
+        self.con = duckdb.connect(database, read_only=read_only, config=self.settings)
+        self._local = threading.local()
+        self._cursors = []
+        self._lock = threading.Lock()
+        for alias, path in (attach or {}).items():
+            self.attach(path, alias)
+
+    def cursor(self):
+        """
+        Return the calling thread's cursor, creating it on first use.
+        """
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            with self._lock:
+                cursor = self.con.cursor()
+                self._cursors.append(cursor)
+            self._local.cursor = cursor
+        return cursor
+
+    def attach(self, path: str, alias: str, read_only: bool = False):
+        """
+        Attach another database file to the connection under an alias.
+        """
+        options = " (READ_ONLY)" if read_only else ""
+        self.con.execute(f"ATTACH IF NOT EXISTS {_sql_string(path)} AS {alias}{options}")
+
+    def detach(self, alias: str):
+        """
+        Detach a previously attached database.
+        """
+        self.con.execute(f"DETACH {alias}")
+
+    def attached(self) -> DataFrame:
+        """
+        List the attached databases, as ``get_attached_dbs``.
+        """
+        return get_attached_dbs(self.con).df()
+
+    def close(self):
+        """
+        Close every cursor handed out and then the connection.
+        """
+        with self._lock:
+            for cursor in self._cursors:
+                cursor.close()
+            self._cursors = []
+        self._local = threading.local()
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
 # Function to get the list of attached databases
 def get_attached_dbs(db_con) -> DataFrame:
@@ -30,8 +186,95 @@ def get_inventory(db_con) -> DataFrame:
     """
     return db_con.sql("SELECT * from duckdb_tables")
 
+# Statements that change the catalog and so invalidate a DuckCatalog snapshot
+DDL_PATTERN = re.compile(r"^\s*(CREATE|DROP|ALTER|ATTACH|DETACH|IMPORT|USE)\b", re.IGNORECASE)
+
+class DuckCatalog:
+    """
+    Cached snapshot of the DuckDB catalog for fast, repeated table and column lookups.
+
+    ``duckdb_tables`` and ``duckdb_columns`` are each fetched once into dictionaries on first
+    use, so checking thousands of tables costs one query instead of one per table. The
+    snapshot is dropped by ``invalidate``, which the duckfunc functions that run DDL call on a
+    catalog passed to them, and by ``execute`` whenever the statement it runs is DDL.
+
+    Args:
+        con: The database connection object.
+
+    Example:
+        >>> catalog = DuckCatalog(con)
+        >>> catalog.table_exists("main_db", "customers")
+        True
+    """
+    def __init__(self, con):
+        self.con = con
+        self._tables = None
+        self._columns = None
+
+    def refresh(self):
+        """
+        Reload the snapshot from ``duckdb_tables`` and ``duckdb_columns``.
+        """
+        tables = {}
+        for db, schema, table, size, ncols in self.con.execute(
+                "SELECT database_name, schema_name, table_name, estimated_size, column_count "
+                "FROM duckdb_tables").fetchall():
+            tables[(db, schema, table)] = {"estimated_size": size, "column_count": ncols}
+        columns = {}
+        for db, schema, table, column, dtype in self.con.execute(
+                "SELECT database_name, schema_name, table_name, column_name, data_type FROM duckdb_columns "
+                "ORDER BY database_name, schema_name, table_name, column_index").fetchall():
+            columns.setdefault((db, schema, table), {})[column] = dtype
+        self._tables = tables
+        self._columns = columns
+
+    def invalidate(self):
+        """
+        Drop the snapshot so it is reloaded on the next lookup.
+        """
+        self._tables = None
+        self._columns = None
+
+    def _snapshot(self):
+        if self._tables is None:
+            self.refresh()
+        return self._tables
+
+    def table_exists(self, dbname: str, tablename: str, schema: str = None) -> bool:
+        """
+        Check if a table exists in the specified database, in any schema unless one is given.
+        """
+        if schema is not None:
+            return (dbname, schema, tablename) in self._snapshot()
+        return any(db == dbname and table == tablename for db, _, table in self._snapshot())
+
+    def list_tables(self, dbname: str = None) -> list:
+        """
+        List (database, schema, table) tuples, optionally for a single database.
+        """
+        return [key for key in self._snapshot() if dbname is None or key[0] == dbname]
+
+    def get_columns(self, dbname: str, tablename: str, schema: str = "main") -> dict:
+        """
+        Get a table's columns as an ordered mapping of column name to DuckDB type.
+        """
+        self._snapshot()
+        return dict(self._columns.get((dbname, schema, tablename), {}))
+
+    def execute(self, query: str, parameters=None):
+        """
+        Execute a statement on the connection, invalidating the snapshot if it is DDL.
+
+        DDL also drops the table fingerprints cached by every ``DuckQueryCache``.
+        """
+        result = self.con.execute(query, parameters)
+        if DDL_PATTERN.match(query):
+            self.invalidate()
+            _forget_table_fingerprints()
+        return result
+
 # Function to check if a table exists
-def does_table_exist(db_con, dbname: str, tablename: str) -> bool:
+def does_table_exist(db_con, dbname: str, tablename: str, catalog: DuckCatalog = None) -> bool:
     """
     Check if a table exists in the specified database.
     
@@ -39,17 +282,18 @@ def does_table_exist(db_con, dbname: str, tablename: str) -> bool:
         db_con: The database connection object.
         dbname (str): The name of the database.
         tablename (str): The name of the table.
+        catalog (DuckCatalog, optional): Catalog snapshot to answer from instead of querying.
 
     Returns:
         bool: True if the table exists, False otherwise.
     """
-    ex_string = f"SELECT COUNT(*) AS c from duckdb_tables WHERE table_name = '{tablename}'"
-    ex_string += f" AND database_name = '{dbname}'"
-    count = db_con.sql(ex_string).df()["c"][0]
-    if count == 1:
-        return True
-    # else
-    return False
+    if catalog is not None:
+        return catalog.table_exists(dbname, tablename)
+    row = db_con.execute(
+        "SELECT 1 FROM duckdb_tables WHERE table_name = ? AND database_name = ? LIMIT 1",
+        [tablename, dbname]
+    ).fetchone()
+    return row is not None
 
 def getCurrentTimeForDuck(timezone_included: bool = False) -> str:
     """
@@ -66,35 +310,228 @@ def getCurrentTimeForDuck(timezone_included: bool = False) -> str:
     # else:
     return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-def init_table(con, frame: 'DataFrame', db: str, tablename: str) -> bool:
+def _arrow_type_to_duck(dtype) -> str:
+    """
+    Map a pyarrow data type onto the equivalent DuckDB column type.
+    """
+    simple = {
+        pa.int8(): "TINYINT", pa.int16(): "SMALLINT", pa.int32(): "INTEGER", pa.int64(): "BIGINT",
+        pa.uint8(): "UTINYINT", pa.uint16(): "USMALLINT", pa.uint32(): "UINTEGER", pa.uint64(): "UBIGINT",
+        pa.float16(): "FLOAT", pa.float32(): "FLOAT", pa.float64(): "DOUBLE", pa.bool_(): "BOOLEAN",
+        pa.string(): "VARCHAR", pa.large_string(): "VARCHAR", pa.binary(): "BLOB", pa.large_binary(): "BLOB",
+        pa.date32(): "DATE", pa.date64(): "DATE", pa.null(): "VARCHAR",
+    }
+    if dtype in simple:
+        return simple[dtype]
+    if hasattr(pa, "string_view") and dtype == pa.string_view():
+        return "VARCHAR"
+    if pa.types.is_timestamp(dtype):
+        return "TIMESTAMPTZ" if dtype.tz else "TIMESTAMP"
+    if pa.types.is_time(dtype):
+        return "TIME"
+    if pa.types.is_duration(dtype):
+        return "INTERVAL"
+    if pa.types.is_decimal(dtype):
+        return f"DECIMAL({dtype.precision}, {dtype.scale})"
+    if pa.types.is_dictionary(dtype):
+        return _arrow_type_to_duck(dtype.value_type)
+    if pa.types.is_list(dtype) or pa.types.is_large_list(dtype):
+        return _arrow_type_to_duck(dtype.value_type) + "[]"
+    if pa.types.is_struct(dtype):
+        fields = ", ".join(f"{field.name} {_arrow_type_to_duck(field.type)}" for field in dtype)
+        return f"STRUCT({fields})"
+    raise ValueError(f"No DuckDB type mapping for Arrow type {dtype}")
+
+class ColumnDef:
+    """
+    Definition of a single table column for ``TableSchema``.
+
+    Args:
+        name (str): Column name.
+        dtype (str): DuckDB column type, e.g. 'INTEGER' or 'DECIMAL(18, 2)'.
+        nullable (bool): Whether NULLs are allowed. Default is True.
+        default (str, optional): SQL expression used as the column default.
+        check (str, optional): SQL expression for a CHECK constraint on the column.
+        compression (str, optional): Compression hint such as 'rle', 'dictionary' or 'bitpacking'.
+    """
+    def __init__(self, name: str, dtype: str, nullable: bool = True, default: str = None,
+                 check: str = None, compression: str = None):
+        self.name = name
+        self.dtype = dtype
+        self.nullable = nullable
+        self.default = default
+        self.check = check
+        self.compression = compression
+
+    def to_sql(self) -> str:
+        """
+        Render the column definition as used inside CREATE TABLE.
+        """
+        sql = f"{self.name} {self.dtype}"
+        if self.compression:
+            sql += f" USING COMPRESSION {self.compression}"
+        if not self.nullable:
+            sql += " NOT NULL"
+        if self.default is not None:
+            sql += f" DEFAULT {self.default}"
+        if self.check:
+            sql += f" CHECK ({self.check})"
+        return sql
+
+class TableSchema:
+    """
+    Typed table definition that renders CREATE TABLE statements for DuckDB.
+
+    Use ``TableSchema.from_any`` to build one from any of the schema forms accepted by
+    ``init_table``:
+
+    * a DataFrame with VARNAME and TYPE columns, optionally NULLABLE, DEFAULT, CHECK and COMPRESSION
+    * a dict of column name to DuckDB type, or to a dict of ``ColumnDef`` arguments
+    * a pyarrow Schema
+    * a Polars Schema, or a dict of column name to Polars data type
+
+    Args:
+        columns (list): List of ColumnDef objects.
+        primary_key (list, optional): Columns forming the primary key.
+        unique (list, optional): Lists of columns, each forming a UNIQUE constraint.
+    """
+    def __init__(self, columns: list, primary_key: list = None, unique: list = None):
+        self.columns = columns
+        self.primary_key = list(primary_key or [])
+        self.unique = [list(cols) for cols in (unique or [])]
+
+    @classmethod
+    def from_any(cls, schema, primary_key: list = None, unique: list = None) -> 'TableSchema':
+        """
+        Build a TableSchema from any supported schema form, see the class description.
+        """
+        if isinstance(schema, TableSchema):
+            if primary_key or unique:
+                return cls(schema.columns, primary_key or schema.primary_key, unique or schema.unique)
+            return schema
+        if isinstance(schema, DataFrame):
+            columns = _column_defs_from_frame(schema)
+        elif isinstance(schema, pa.Schema):
+            columns = [ColumnDef(field.name, _arrow_type_to_duck(field.type), field.nullable) for field in schema]
+        elif isinstance(schema, getattr(pl, "Schema", ())) or (isinstance(schema, dict) and schema and
+                                               all(isinstance(v, (pl.DataType, type)) for v in schema.values())):
+            arrow_schema = pl.DataFrame(schema=schema).to_arrow().schema
+            columns = [ColumnDef(field.name, _arrow_type_to_duck(field.type)) for field in arrow_schema]
+        elif isinstance(schema, dict):
+            columns = [ColumnDef(name, **spec) if isinstance(spec, dict) else ColumnDef(name, spec)
+                       for name, spec in schema.items()]
+        else:
+            raise TypeError(f"Unsupported schema type {type(schema).__name__}")
+        return cls(columns, primary_key, unique)
+
+    def to_ddl(self, table_ref: str, if_not_exists: bool = True) -> str:
+        """
+        Render the CREATE TABLE statement for this schema.
+
+        Args:
+            table_ref (str): Table reference, e.g. 'db.table'.
+            if_not_exists (bool): Add IF NOT EXISTS. Default is True.
+
+        Returns:
+            str: The DDL statement.
+        """
+        parts = [column.to_sql() for column in self.columns]
+        if self.primary_key:
+            parts.append(f"PRIMARY KEY ({', '.join(self.primary_key)})")
+        parts += [f"UNIQUE ({', '.join(cols)})" for cols in self.unique]
+        exists = "IF NOT EXISTS " if if_not_exists else ""
+        return f"CREATE TABLE {exists}{table_ref} ({', '.join(parts)})"
+
+def _column_defs_from_frame(frame: DataFrame) -> list:
+    """
+    Build ColumnDef objects from a VARNAME/TYPE frame without iterating rows through pandas.
+    """
+    n = len(frame)
+    optional = {col: frame[col].tolist() if col in frame.columns else [None] * n
+                for col in ("NULLABLE", "DEFAULT", "CHECK", "COMPRESSION")}
+    return [
+        ColumnDef(name, dtype,
+                  nullable=True if pd.isna(nullable) else bool(nullable),
+                  default=None if pd.isna(default) else default,
+                  check=None if pd.isna(check) else check,
+                  compression=None if pd.isna(compression) else compression)
+        for name, dtype, nullable, default, check, compression in zip(
+            frame["VARNAME"].tolist(), frame["TYPE"].tolist(), optional["NULLABLE"],
+            optional["DEFAULT"], optional["CHECK"], optional["COMPRESSION"])
+    ]
+
+def init_table(con, frame, db: str, tablename: str, catalog: DuckCatalog = None,
+               primary_key: list = None) -> bool:
     """
     Initialize a table in the specified database.
     
     Args:
         con: The database connection object.
-        frame (DataFrame): A DataFrame containing columns VARNAME and TYPE, which should be DuckDB-compatible.
+        frame: The table schema. A DataFrame containing columns VARNAME and TYPE, which should be
+            DuckDB-compatible, or any other form accepted by ``TableSchema.from_any`` (a dict,
+            a pyarrow schema, a Polars schema or a TableSchema).
         db (str): The name of the database.
         tablename (str): The name of the table.
+        catalog (DuckCatalog, optional): Catalog snapshot used for the existence check and
+            invalidated once the table is created.
+        primary_key (list, optional): Columns forming the primary key.
     
     Returns:
         bool: True if the table was created, False if it already exists.
     """
     # Check if the table exists
-    exist = does_table_exist(con, db, tablename)
+    exist = does_table_exist(con, db, tablename, catalog)
     if not exist:
         print("Creating table " + db + "." + tablename)
 
         tbl_ref = db + "." + tablename
-        exstring = "CREATE TABLE IF NOT EXISTS " + tbl_ref + "("
-        # Create a comma-delimited list with variable names and types
-        exstring += ', '.join([f"{row['VARNAME']} {row['TYPE']}" for _, row in frame.iterrows()])
-        exstring += ")"
+        schema = TableSchema.from_any(frame, primary_key=primary_key)
         # Execute the SQL command to create the table
-        con.sql(exstring)
+        con.sql(schema.to_ddl(tbl_ref))
+        if catalog is not None:
+            catalog.invalidate()
+        _forget_table_fingerprints(tablename)
         return True
     # else
     return False
 
+def init_tables(con, schemas: dict, db: str, catalog: DuckCatalog = None) -> list:
+    """
+    Initialize many tables in the specified database in a single transaction.
+
+    Existence is checked against one catalog snapshot rather than a query per table, and all
+    CREATE statements are committed together, so either every missing table is created or none is.
+
+    Args:
+        con: The database connection object.
+        schemas (dict): Table name to schema, in any form accepted by ``init_table``.
+        db (str): The name of the database.
+        catalog (DuckCatalog, optional): Catalog snapshot to use; one is taken if not given.
+
+    Returns:
+        list: Names of the tables that were created.
+    """
+    catalog = catalog or DuckCatalog(con)
+    to_create = {name: TableSchema.from_any(schema) for name, schema in schemas.items()
+                 if not catalog.table_exists(db, name)}
+    if not to_create:
+        return []
+
+    con.execute("BEGIN TRANSACTION")
+    try:
+        for name, schema in to_create.items():
+            con.execute(schema.to_ddl(f"{db}.{name}"))
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    finally:
+        catalog.invalidate()
+        for name in to_create:
+            _forget_table_fingerprints(name)
+    print(f"Created {len(to_create)} tables in {db}")
+    return list(to_create)
+
 def getDuckVersion(con) -> str:
     """
     Get the connected DuckDB version.
@@ -108,54 +545,296 @@ def getDuckVersion(con) -> str:
     df = con.sql("SELECT version() AS version").df()
     return df['version'][0]
 
-def get_table_as_df(con, db_name: str, table_name: str) -> DataFrame:
+# Return types supported by get_table_as_df
+RETURN_TYPES = ("pandas", "arrow", "polars")
+
+# Output formats written natively by save_from_db through COPY ... TO
+COPY_FORMATS = ("parquet", "csv", "psv", "json")
+
+def _to_arrow_table(relation):
+    """
+    Materialise a DuckDB relation as a pyarrow Table, across DuckDB versions.
+    """
+    if hasattr(relation, "to_arrow_table"):
+        return relation.to_arrow_table()
+    return relation.fetch_arrow_table()
+
+def _to_arrow_reader(relation, batch_size: int):
+    """
+    Stream a DuckDB relation as a pyarrow RecordBatchReader, across DuckDB versions.
+    """
+    if hasattr(relation, "to_arrow_reader"):
+        return relation.to_arrow_reader(batch_size)
+    return relation.fetch_record_batch(batch_size)
+
+def _sql_string(value: str) -> str:
+    """
+    Quote a value as a SQL string literal.
     """
-    Query a table from the specified database and return it as a pandas DataFrame.
+    return "'" + str(value).replace("'", "''") + "'"
+
+def get_table_as_df(con, db_name: str, table_name: str, catalog: DuckCatalog = None, return_type: str = "pandas"):
+    """
+    Query a table from the specified database and return it as a DataFrame.
     
     Args:
         con: Database connection object
         db_name (str): Name of the database
         table_name (str): Name of the table
+        catalog (DuckCatalog, optional): Catalog snapshot used for the existence check
+        return_type (str): One of 'pandas' (default), 'arrow' for a zero-copy pyarrow Table
+            or 'polars' for a Polars DataFrame built from Arrow
         
     Returns:
-        DataFrame: The table contents as a pandas DataFrame, or None if the table doesn't exist
+        The table contents in the requested type, or None if the table doesn't exist
     """
+    if return_type not in RETURN_TYPES:
+        raise ValueError(f"return_type must be one of {RETURN_TYPES}")
+
     # Check if the table exists
-    if not does_table_exist(con, db_name, table_name):
+    if not does_table_exist(con, db_name, table_name, catalog):
         print(f"Table {db_name}.{table_name} does not exist.")
         return None
     
     # Query the table
     query = f"SELECT * FROM {db_name}.{table_name}"
+    if return_type == "arrow":
+        return _to_arrow_table(con.sql(query))
+    if return_type == "polars":
+        return con.sql(query).pl()
     return con.sql(query).df()
 
-def save_from_db(con, db_name: str, table_name: str, output_path: str) -> bool:
+def get_table_batch_reader(con, db_name: str, table_name: str, batch_size: int = 1_000_000,
+                           catalog: DuckCatalog = None):
+    """
+    Stream a table from the specified database as Arrow record batches.
+
+    Only one batch is materialised at a time, so tables larger than memory can be processed.
+
+    Args:
+        con: Database connection object
+        db_name (str): Name of the database
+        table_name (str): Name of the table
+        batch_size (int): Number of rows per record batch. Default is 1,000,000.
+        catalog (DuckCatalog, optional): Catalog snapshot used for the existence check
+
+    Returns:
+        pyarrow.RecordBatchReader: A reader over the table, or None if the table doesn't exist
+    """
+    if not does_table_exist(con, db_name, table_name, catalog):
+        print(f"Table {db_name}.{table_name} does not exist.")
+        return None
+    return _to_arrow_reader(con.sql(f"SELECT * FROM {db_name}.{table_name}"), batch_size)
+
+def save_from_db(con, db_name: str, table_name: str, output_path: str, format: str = None,
+                 compression: str = None, partition_by: list = None, catalog: DuckCatalog = None) -> bool:
     """
     Query a table from the specified database and save it to the given output path.
     The output format is determined from the file extension of the output path.
 
+    Parquet, CSV, PSV and JSON are written by DuckDB itself with ``COPY ... TO``, which streams
+    the table without materialising it in Python. Other formats supported by
+    ``dataio.write_flat_df`` go through a pandas DataFrame.
+
     Args:
         con: Database connection object
         db_name (str): Name of the database
         table_name (str): Name of the table
         output_path (str): Path to save the output file (extension determines format)
+        format (str, optional): Output format, overriding the extension, e.g. for partitioned
+            output written to a directory
+        compression (str, optional): Compression codec passed to COPY, e.g. 'zstd' or 'snappy'
+            for parquet and 'gzip' for csv/psv/json
+        partition_by (list, optional): Columns to partition the output by (hive style
+            ``col=value`` directories below output_path)
+        catalog (DuckCatalog, optional): Catalog snapshot used for the existence check
         
     Returns:
         bool: True if the table existed and was saved, False otherwise
     """
-    # Get the table as a DataFrame
-    df = get_table_as_df(con, db_name, table_name)
-    
-    if df is None:
+    if not does_table_exist(con, db_name, table_name, catalog):
+        print(f"Table {db_name}.{table_name} does not exist.")
         print(f"Skipping export of {db_name}.{table_name}.")
         return False
 
-    # Determine format from output_path extension and use dataio to write file
-    dataio.write_flat_df(df, output_path)
+    format = format or fileio.get_file_extension(output_path)
+    if format in COPY_FORMATS:
+        copy_table_to_file(con, f"{db_name}.{table_name}", output_path, format,
+                           compression=compression, partition_by=partition_by)
+    elif partition_by or compression:
+        raise ValueError(f"compression and partition_by are only supported for {COPY_FORMATS}")
+    else:
+        # Determine format from output_path extension and use dataio to write file
+        df = get_table_as_df(con, db_name, table_name, catalog)
+        dataio.write_flat_df(df, output_path)
     
     print(f"Dumped {db_name}.{table_name} to {output_path}")
     return True
 
+def copy_table_to_file(con, source: str, output_path: str, format: str,
+                       compression: str = None, partition_by: list = None):
+    """
+    Write a table, view or query to a file with DuckDB's native ``COPY ... TO``.
+
+    Args:
+        con: Database connection object
+        source (str): A table reference such as ``db.table``, or a query in parentheses
+        output_path (str): Destination file, or directory when partitioning
+        format (str): One of 'parquet', 'csv', 'psv' or 'json'
+        compression (str, optional): Compression codec passed to COPY
+        partition_by (list, optional): Columns to partition the output by
+
+    Returns:
+        int: The number of rows written
+    """
+    if format not in COPY_FORMATS:
+        raise ValueError(f"Unsupported COPY format {format}, must be one of {COPY_FORMATS}")
+
+    options = []
+    if format == "parquet":
+        options.append("FORMAT parquet")
+    elif format == "json":
+        # a JSON array, matching dataio.write_json_file
+        options += ["FORMAT json", "ARRAY true"]
+    else:
+        options += ["FORMAT csv", "HEADER true"]
+        if format == "psv":
+            options.append("DELIMITER '|'")
+    if compression:
+        options.append(f"COMPRESSION {compression}")
+    if partition_by:
+        options.append(f"PARTITION_BY ({', '.join(partition_by)})")
+        options.append("OVERWRITE_OR_IGNORE true")
+    else:
+        fileio.create_filepath_dirs(output_path)
+
+    return con.execute(f"COPY {source} TO {_sql_string(output_path)} ({', '.join(options)})").fetchone()[0]
+
+# Free memory reserved per concurrent export/import worker
+EXPORT_WORKER_MEMORY = 1024 ** 3
+
+def _parallel_workers(max_workers: int, n_tasks: int) -> int:
+    """
+    Bound the number of concurrent COPY workers by cores, free memory and the number of tasks.
+    """
+    if max_workers is None:
+        max_workers = min(systeminfo.get_number_virtual_cores(), systeminfo.get_free_ram() // EXPORT_WORKER_MEMORY)
+    return max(1, min(max_workers, n_tasks))
+
+def export_database(con, db_name: str, out_dir: str, format: str = "parquet", compression: str = None,
+                    max_workers: int = None, checksum: str = "sha256", catalog: DuckCatalog = None) -> dict:
+    """
+    Export every table of a database to files concurrently and write a manifest.
+
+    Tables are enumerated from the catalog and each is written with ``COPY ... TO`` on its
+    own cursor, so several tables stream out at once. The number of workers defaults to
+    the number of cores, reduced if there is less than ``EXPORT_WORKER_MEMORY`` of free
+    memory per worker. ``manifest.json`` in ``out_dir`` lists each table's file, column
+    types, row count, size and checksum, which ``import_database`` uses to rebuild it.
+
+    Args:
+        con: The database connection object.
+        db_name (str): Name of the database to export.
+        out_dir (str): Directory to write the table files and manifest to.
+        format (str): One of 'parquet', 'csv', 'psv' or 'json'. Default is 'parquet'.
+        compression (str, optional): Compression codec passed to COPY.
+        max_workers (int, optional): Number of tables exported at once.
+        checksum (str): hashlib algorithm for the file checksums. Default is 'sha256'.
+        catalog (DuckCatalog, optional): Catalog snapshot used to enumerate the tables.
+
+    Returns:
+        dict: The manifest.
+    """
+    if format not in COPY_FORMATS:
+        raise ValueError(f"Unsupported COPY format {format}, must be one of {COPY_FORMATS}")
+    catalog = catalog or DuckCatalog(con)
+    tables = sorted(catalog.list_tables(db_name))
+    os.makedirs(out_dir, exist_ok=True)
+
+    def _export(key):
+        _, schema, table = key
+        file_name = f"{table}.{format}" if schema == "main" else f"{schema}.{table}.{format}"
+        path = os.path.join(out_dir, file_name)
+        with con.cursor() as cursor:
+            rows = copy_table_to_file(cursor, f'{db_name}."{schema}"."{table}"', path, format,
+                                      compression=compression)
+        print(f"Dumped {db_name}.{schema}.{table} to {path}")
+        return {"schema": schema, "table": table, "file": file_name,
+                "columns": catalog.get_columns(db_name, table, schema), "rows": rows,
+                "bytes": os.path.getsize(path), checksum: fileio.calculate_file_checksum(path, checksum)}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=_parallel_workers(max_workers, len(tables))) as executor:
+        entries = list(executor.map(_export, tables))
+    manifest = {"database": db_name, "format": format, "compression": compression, "checksum": checksum,
+                "created": getCurrentTimeForDuck(), "duckdb_version": getDuckVersion(con), "tables": entries}
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    print(f"Exported {len(entries)} tables from {db_name} in {round(time.perf_counter() - start, 2)}s")
+    return manifest
+
+def import_database(con, in_dir: str, db_name: str = None, max_workers: int = None, verify: bool = True,
+                    catalog: DuckCatalog = None) -> dict:
+    """
+    Rebuild the tables written by ``export_database`` concurrently.
+
+    Each table is checked against the manifest checksum (if ``verify``), recreated with
+    ``CREATE OR REPLACE TABLE ... AS SELECT`` on its own cursor using the column types in
+    the manifest, and its row count is compared with the exported count.
+
+    Args:
+        con: The database connection object.
+        in_dir (str): Directory containing the exported files and ``manifest.json``.
+        db_name (str, optional): Database to create the tables in. Defaults to the current database.
+        max_workers (int, optional): Number of tables imported at once.
+        verify (bool): Verify file checksums before loading. Default is True.
+        catalog (DuckCatalog, optional): Catalog snapshot to invalidate after importing.
+
+    Returns:
+        dict: A mapping of ``schema.table`` to the number of rows loaded.
+    """
+    with open(os.path.join(in_dir, "manifest.json"), encoding="utf-8") as file:
+        manifest = json.load(file)
+    db_name = db_name or con.execute("SELECT current_database()").fetchone()[0]
+    format = manifest["format"]
+    for schema in {entry["schema"] for entry in manifest["tables"]}:
+        con.execute(f'CREATE SCHEMA IF NOT EXISTS {db_name}."{schema}"')
+
+    def _import(entry):
+        path = os.path.join(in_dir, entry["file"])
+        if verify and fileio.calculate_file_checksum(path, manifest["checksum"]) != entry[manifest["checksum"]]:
+            raise ValueError(f"Checksum mismatch for {path}")
+        if format == "parquet":
+            source_sql = _read_function([path], format)
+        else:
+            # text formats are read with the exported column types instead of auto-detection
+            options = {"columns": entry["columns"]}
+            if manifest.get("compression"):
+                options["compression"] = manifest["compression"]
+            if format == "json":
+                options["format"] = "array"
+                source_sql = f"read_json({_sql_string(path)}, " + \
+                    ", ".join(f"{key} = {_sql_literal(value)}" for key, value in options.items()) + ")"
+            else:
+                options["auto_detect"] = False
+                source_sql = _read_function([path], format, read_options=options)
+        target = f'{db_name}."{entry["schema"]}"."{entry["table"]}"'
+        with con.cursor() as cursor:
+            rows = cursor.execute(f"CREATE OR REPLACE TABLE {target} AS SELECT * FROM {source_sql}").fetchone()[0]
+        if rows != entry["rows"]:
+            raise ValueError(f"Loaded {rows} rows into {target}, expected {entry['rows']}")
+        return f"{entry['schema']}.{entry['table']}", rows
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=_parallel_workers(max_workers, len(manifest["tables"]))) as executor:
+        loaded = dict(executor.map(_import, manifest["tables"]))
+    if catalog is not None:
+        catalog.invalidate()
+    for entry in manifest["tables"]:
+        _forget_table_fingerprints(entry["table"])
+    print(f"Imported {len(loaded)} tables into {db_name} in {round(time.perf_counter() - start, 2)}s")
+    return loaded
+
 def load_csv_to_db(con, tablename:str, csvpath:str):
     """
     Load a csv file directly to a table
@@ -167,6 +846,484 @@ def load_csv_to_db(con, tablename:str, csvpath:str):
         CREATE TABLE IF NOT EXISTS {tablename} AS SELECT * FROM read_csv_auto('{csvpath}')
     """)
 
+# Load modes supported by bulk_load
+LOAD_MODES = ("create", "append", "replace", "upsert")
+
+# File formats read natively by bulk_load
+LOAD_FORMATS = ("csv", "psv", "parquet", "sas7bdat")
+
+def _sql_literal(value) -> str:
+    """
+    Render a Python value as a DuckDB SQL literal for use in table function arguments.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{_sql_string(k)}: {_sql_literal(v)}" for k, v in value.items()) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_sql_literal(v) for v in value) + "]"
+    return _sql_string(value)
+
+def _read_function(paths: list, format: str, column_types: dict = None, read_options: dict = None) -> str:
+    """
+    Build the DuckDB table function call reading a list of files or globs in one scan.
+    """
+    options = dict(read_options or {})
+    if format == "parquet":
+        function = "read_parquet"
+    else:
+        function = "read_csv"
+        options.setdefault("header", True)
+        if format == "psv":
+            options.setdefault("delim", "|")
+        if column_types:
+            # typed at read time so auto-detection can't mangle values (e.g. leading zeros)
+            options.setdefault("types", column_types)
+    args = [_sql_literal(list(paths))] + [f"{key} = {_sql_literal(value)}" for key, value in options.items()]
+    return f"{function}({', '.join(args)})"
+
+def _qualified_table_exists(con, tablename: str) -> bool:
+    """
+    Check if a table referenced as ``table``, ``db.table``/``schema.table`` or ``db.schema.table`` exists.
+    """
+    parts = tablename.split(".")
+    query = "SELECT 1 FROM duckdb_tables WHERE table_name = ?"
+    params = [parts[-1]]
+    if len(parts) >= 2:
+        query += " AND (schema_name = ? OR database_name = ?)"
+        params += [parts[-2], parts[-2]]
+    if len(parts) == 3:
+        query += " AND database_name = ?"
+        params.append(parts[0])
+    return con.execute(query + " LIMIT 1", params).fetchone() is not None
+
+def _load_relation(con, tablename: str, source_sql: str, mode: str, keys: list = None,
+                   column_types: dict = None) -> int:
+    """
+    Load the rows of a FROM clause into a table according to the load mode, returning the row count.
+    """
+    select = "SELECT *"
+    if column_types:
+        casts = ", ".join(f"CAST({col} AS {dtype}) AS {col}" for col, dtype in column_types.items())
+        select = f"SELECT * REPLACE ({casts})"
+    select += f" FROM {source_sql}"
+
+    if mode == "replace":
+        return con.execute(f"CREATE OR REPLACE TABLE {tablename} AS {select}").fetchone()[0]
+    if mode == "create":
+        return con.execute(f"CREATE TABLE {tablename} AS {select}").fetchone()[0]
+
+    # append and upsert create the table on first load
+    if not _qualified_table_exists(con, tablename):
+        return con.execute(f"CREATE TABLE {tablename} AS {select}").fetchone()[0]
+    if mode == "append":
+        return con.execute(f"INSERT INTO {tablename} BY NAME {select}").fetchone()[0]
+
+    # upsert: replace rows whose keys are present in the source, in one transaction
+    key_match = " AND ".join(f"{tablename}.{key} = src.{key}" for key in keys)
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute(f"CREATE OR REPLACE TEMP TABLE _bulk_load_stage AS {select}")
+        con.execute(f"DELETE FROM {tablename} USING _bulk_load_stage AS src WHERE {key_match}")
+        rows = con.execute(f"INSERT INTO {tablename} BY NAME SELECT * FROM _bulk_load_stage").fetchone()[0]
+        con.execute("DROP TABLE _bulk_load_stage")
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return rows
+
+def bulk_load(con, tablename: str, source, mode: str = "create", format: str = None,
+              column_types: dict = None, keys: list = None, read_options: dict = None,
+              sas_chunksize: int = 100_000, catalog: DuckCatalog = None) -> dict:
+    """
+    Load files or in-memory frames into a table in a single statement where possible.
+
+    Sources can be:
+
+    * a pandas DataFrame, Polars DataFrame or pyarrow Table/RecordBatchReader, which are
+      registered with DuckDB and scanned in place without a copy
+    * a file path, a glob (e.g. ``landing/*.psv``) or a list of paths/globs in csv, psv or
+      parquet format, which DuckDB reads in one parallel scan
+    * a SAS file (``sas7bdat``), which is read with pandas in chunks of ``sas_chunksize`` rows
+
+    Args:
+        con: The database connection object.
+        tablename (str): Target table, optionally qualified as ``db.table``.
+        source: The data to load, as described above.
+        mode (str): 'create' (fails if the table exists), 'append', 'replace' or 'upsert'.
+            'append' and 'upsert' create the table if it does not exist yet. Default is 'create'.
+        format (str, optional): File format, inferred from the (first) path extension if omitted.
+        column_types (dict, optional): Column name to DuckDB type, applied while reading csv/psv
+            and by casting for parquet, SAS and in-memory sources.
+        keys (list, optional): Key columns identifying rows to replace, required for 'upsert'.
+        read_options (dict, optional): Extra arguments for ``read_csv``/``read_parquet``,
+            e.g. ``{"union_by_name": True}``.
+        sas_chunksize (int): Rows per chunk when loading SAS files. Default is 100,000.
+        catalog (DuckCatalog, optional): Catalog snapshot to invalidate after loading.
+
+    Returns:
+        dict: ``rows`` loaded, elapsed ``seconds`` and ``rows_per_s``.
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"mode must be one of {LOAD_MODES}")
+    if mode == "upsert" and not keys:
+        raise ValueError("keys must be provided for mode 'upsert'")
+
+    start = time.perf_counter()
+    if isinstance(source, (str, list, tuple)):
+        paths = [source] if isinstance(source, str) else list(source)
+        format = format or fileio.get_file_extension(paths[0])
+        if format not in LOAD_FORMATS:
+            raise ValueError(f"Unsupported file format {format}, must be one of {LOAD_FORMATS}")
+        for path in paths:
+            if not glob.has_magic(path) and not os.path.exists(path):
+                raise FileNotFoundError(f"File {path} does not exist.")
+
+        if format == "sas7bdat":
+            rows = 0
+            for path in paths:
+                for chunk in pd.read_sas(path, format="sas7bdat", chunksize=sas_chunksize, encoding="latin-1"):
+                    rows += _load_registered(con, tablename, chunk, mode, keys, column_types)
+                    # later chunks add to what the first chunk created
+                    mode = "append" if mode in ("create", "replace") else mode
+        else:
+            # csv/psv are typed by the reader, parquet columns are cast after reading
+            rows = _load_relation(con, tablename, _read_function(paths, format, column_types, read_options),
+                                  mode, keys, column_types if format == "parquet" else None)
+    else:
+        rows = _load_registered(con, tablename, source, mode, keys, column_types)
+
+    if catalog is not None:
+        catalog.invalidate()
+    touch_table_version(con, tablename)
+    seconds = time.perf_counter() - start
+    stats = {"rows": rows, "seconds": seconds, "rows_per_s": rows / seconds if seconds > 0 else 0.0}
+    print(f"Loaded {rows} rows into {tablename} in {round(seconds, 2)}s ({round(stats['rows_per_s'])} rows/s)")
+    return stats
+
+def _load_registered(con, tablename: str, frame, mode: str, keys: list, column_types: dict) -> int:
+    """
+    Register an in-memory frame with DuckDB and load it without copying it first.
+    """
+    view_name = f"_bulk_load_src_{uuid.uuid4().hex}"
+    con.register(view_name, frame)
+    try:
+        return _load_relation(con, tablename, view_name, mode, keys, column_types)
+    finally:
+        con.unregister(view_name)
+
+def _stage_source(con, stage: str, source, format: str = None, read_options: dict = None) -> int:
+    """
+    Copy a file, glob or in-memory frame into a temporary stage table, returning its row count.
+    """
+    if isinstance(source, (str, list, tuple)):
+        paths = [source] if isinstance(source, str) else list(source)
+        format = format or fileio.get_file_extension(paths[0])
+        if format not in ("csv", "psv", "parquet"):
+            raise ValueError(f"Unsupported file format {format}, must be one of ('csv', 'psv', 'parquet')")
+        source_sql = _read_function(paths, format, read_options=read_options)
+        return con.execute(f"CREATE OR REPLACE TEMP TABLE {stage} AS SELECT * FROM {source_sql}").fetchone()[0]
+    view_name = f"_stage_src_{uuid.uuid4().hex}"
+    con.register(view_name, source)
+    try:
+        return con.execute(f"CREATE OR REPLACE TEMP TABLE {stage} AS SELECT * FROM {view_name}").fetchone()[0]
+    finally:
+        con.unregister(view_name)
+
+def _resolve_table(con, tablename: str) -> tuple:
+    """
+    Resolve ``table``, ``db.table``/``schema.table`` or ``db.schema.table`` to (database, schema, table).
+    """
+    parts = [part.strip('"') for part in tablename.split(".")]
+    if len(parts) == 3:
+        return tuple(parts)
+    database, schema = con.execute("SELECT current_database(), current_schema()").fetchone()
+    if len(parts) == 1:
+        return database, schema, parts[0]
+    # as in DuckDB's binder, a schema of the current database takes precedence over a database name
+    if con.execute("SELECT 1 FROM duckdb_schemas() WHERE database_name = ? AND schema_name = ?",
+                   [database, parts[0]]).fetchone():
+        return database, parts[0], parts[1]
+    return parts[0], "main", parts[1]
+
+def _has_conflict_target(con, tablename: str, keys: list) -> bool:
+    """
+    Check if a table has a PRIMARY KEY or UNIQUE constraint on exactly the key columns.
+    """
+    rows = con.execute("""
+        SELECT constraint_column_names FROM duckdb_constraints()
+        WHERE database_name = ? AND schema_name = ? AND table_name = ?
+          AND constraint_type IN ('PRIMARY KEY', 'UNIQUE')
+    """, list(_resolve_table(con, tablename))).fetchall()
+    return any(sorted(columns) == sorted(keys) for (columns,) in rows)
+
+def _finish_incremental(con, tablename: str, stats: dict, start: float, catalog: DuckCatalog) -> dict:
+    """
+    Invalidate caches after an incremental load and report its counts.
+    """
+    if catalog is not None:
+        catalog.invalidate()
+    if stats["inserted"] or stats.get("updated"):
+        touch_table_version(con, tablename)
+    stats["seconds"] = time.perf_counter() - start
+    counts = ", ".join(f"{value} {key}" for key, value in stats.items() if key != "seconds")
+    print(f"{tablename}: {counts} in {round(stats['seconds'], 2)}s")
+    return stats
+
+def upsert(con, tablename: str, source, keys: list, format: str = None, read_options: dict = None,
+           catalog: DuckCatalog = None) -> dict:
+    """
+    Insert new rows and update changed rows of a table from a delta, in one transaction.
+
+    The source is staged once, compared with the table on the key columns, and only new
+    or changed rows are written with ``INSERT ... ON CONFLICT DO UPDATE``; rows identical
+    to the table are skipped. If the table does not exist it is created from the source
+    with a primary key on ``keys``. Tables created without a matching PRIMARY KEY/UNIQUE
+    constraint are updated with ``UPDATE ... FROM`` instead. Keys must be unique in the source.
+
+    Args:
+        con: The database connection object.
+        tablename (str): Target table, optionally qualified as ``db.table``.
+        source: A pandas/Polars DataFrame, pyarrow Table, or csv/psv/parquet path, glob or list of paths.
+        keys (list): Key columns identifying rows.
+        format (str, optional): File format, inferred from the (first) path extension if omitted.
+        read_options (dict, optional): Extra arguments for ``read_csv``/``read_parquet``.
+        catalog (DuckCatalog, optional): Catalog snapshot to invalidate after loading.
+
+    Returns:
+        dict: Counts of rows ``inserted``, ``updated`` and ``skipped``, and elapsed ``seconds``.
+    """
+    if not keys:
+        raise ValueError("keys must be provided for upsert")
+    start = time.perf_counter()
+    stage = f"_upsert_stage_{uuid.uuid4().hex}"
+    con.execute("BEGIN TRANSACTION")
+    try:
+        staged = _stage_source(con, stage, source, format, read_options)
+        distinct = con.execute(f"SELECT count(*) FROM (SELECT DISTINCT {', '.join(keys)} FROM {stage})").fetchone()[0]
+        if distinct != staged:
+            raise ValueError(f"Source has {staged - distinct} rows with duplicate keys {keys}")
+        if not _qualified_table_exists(con, tablename):
+            con.execute(f"CREATE TABLE {tablename} AS SELECT * FROM {stage}")
+            con.execute(f"ALTER TABLE {tablename} ADD PRIMARY KEY ({', '.join(keys)})")
+            stats = {"inserted": staged, "updated": 0, "skipped": 0}
+        else:
+            target_cols = set(con.sql(f"SELECT * FROM {tablename}").columns)
+            values = [col for col in con.sql(f"SELECT * FROM {stage}").columns
+                      if col in target_cols and col not in keys]
+            key_match = " AND ".join(f"s.{key} = t.{key}" for key in keys)
+            changed = " OR ".join(f"s.{col} IS DISTINCT FROM t.{col}" for col in values) or "false"
+            delta = f"{stage}_delta"
+            con.execute(f"""
+                CREATE TEMP TABLE {delta} AS
+                SELECT s.*, t.{keys[0]} IS NOT NULL AS _exists
+                FROM {stage} s LEFT JOIN {tablename} t ON {key_match}
+                WHERE t.{keys[0]} IS NULL OR {changed}
+            """)
+            inserted, updated = con.execute(
+                f"SELECT count(*) FILTER (NOT _exists), count(*) FILTER (_exists) FROM {delta}").fetchone()
+            if _has_conflict_target(con, tablename, keys):
+                on_conflict = (f"DO UPDATE SET {', '.join(f'{col} = EXCLUDED.{col}' for col in values)}"
+                               if values else "DO NOTHING")
+                con.execute(f"INSERT INTO {tablename} BY NAME SELECT * EXCLUDE (_exists) FROM {delta} "
+                            f"ON CONFLICT ({', '.join(keys)}) {on_conflict}")
+            else:
+                if updated and values:
+                    con.execute(f"UPDATE {tablename} AS t SET {', '.join(f'{col} = s.{col}' for col in values)} "
+                                f"FROM {delta} s WHERE s._exists AND {key_match}")
+                con.execute(f"INSERT INTO {tablename} BY NAME SELECT * EXCLUDE (_exists) FROM {delta} "
+                            f"WHERE NOT _exists")
+            con.execute(f"DROP TABLE {delta}")
+            stats = {"inserted": inserted, "updated": updated, "skipped": staged - inserted - updated}
+        con.execute(f"DROP TABLE {stage}")
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return _finish_incremental(con, tablename, stats, start, catalog)
+
+def append_new(con, tablename: str, source, watermark_col: str, keys: list = None, format: str = None,
+               read_options: dict = None, catalog: DuckCatalog = None) -> dict:
+    """
+    Append only the rows of a source that are newer than the table's high watermark.
+
+    Rows with ``watermark_col`` greater than the table's current maximum are inserted. If
+    ``keys`` are given, rows at the watermark itself are also considered and an anti-join on
+    the keys drops any already loaded, so late rows sharing the last timestamp are not lost.
+    If the table does not exist it is created from the whole source.
+
+    Args:
+        con: The database connection object.
+        tablename (str): Target table, optionally qualified as ``db.table``.
+        source: A pandas/Polars DataFrame, pyarrow Table, or csv/psv/parquet path, glob or list of paths.
+        watermark_col (str): Monotonically increasing column, e.g. a load timestamp or sequence id.
+        keys (list, optional): Key columns used to skip rows already loaded at the watermark.
+        format (str, optional): File format, inferred from the (first) path extension if omitted.
+        read_options (dict, optional): Extra arguments for ``read_csv``/``read_parquet``.
+        catalog (DuckCatalog, optional): Catalog snapshot to invalidate after loading.
+
+    Returns:
+        dict: Counts of rows ``inserted`` and ``skipped``, and elapsed ``seconds``.
+    """
+    start = time.perf_counter()
+    stage = f"_append_stage_{uuid.uuid4().hex}"
+    con.execute("BEGIN TRANSACTION")
+    try:
+        staged = _stage_source(con, stage, source, format, read_options)
+        if not _qualified_table_exists(con, tablename):
+            inserted = con.execute(f"CREATE TABLE {tablename} AS SELECT * FROM {stage}").fetchone()[0]
+        else:
+            watermark = con.execute(f"SELECT max({watermark_col}) FROM {tablename}").fetchone()[0]
+            query = f"SELECT s.* FROM {stage} s"
+            if keys:
+                key_match = " AND ".join(f"s.{key} = t.{key}" for key in keys)
+                query += f" ANTI JOIN {tablename} t ON {key_match}"
+            params = []
+            if watermark is not None:
+                query += f" WHERE s.{watermark_col} {'>=' if keys else '>'} ?"
+                params.append(watermark)
+            inserted = con.execute(f"INSERT INTO {tablename} BY NAME {query}", params).fetchone()[0]
+        con.execute(f"DROP TABLE {stage}")
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return _finish_incremental(con, tablename, {"inserted": inserted, "skipped": staged - inserted}, start, catalog)
+
+# DuckDB types approx_quantile can be computed on
+QUANTILE_TYPE_PATTERN = re.compile(r"^(U?(TINY|SMALL|BIG|HUGE)?INT(EGER)?|DOUBLE|FLOAT|REAL|DECIMAL.*)$", re.IGNORECASE)
+
+def _profile_source_sql(con, source, format: str = None, read_options: dict = None):
+    """
+    Return a FROM clause for a table name, file path/glob or in-memory frame, and the name of any view registered for it.
+    """
+    if not isinstance(source, (str, list, tuple)):
+        view_name = f"_profile_src_{uuid.uuid4().hex}"
+        con.register(view_name, source)
+        return view_name, view_name
+    paths = [source] if isinstance(source, str) else list(source)
+    extn = format or fileio.get_file_extension(paths[0])
+    if extn in ("csv", "psv", "parquet") and (len(paths) > 1 or glob.has_magic(paths[0]) or os.path.exists(paths[0])):
+        return _read_function(paths, extn, read_options=read_options), None
+    return source, None
+
+def profile_table(con, source, quantiles: list = None, format: str = None, read_options: dict = None,
+                  stats_table: str = None) -> DataFrame:
+    """
+    Profile a table, file or frame with DuckDB's ``SUMMARIZE`` without loading it into Python.
+
+    ``SUMMARIZE`` gives each column's type, min, max, approximate distinct count, mean,
+    standard deviation, approximate quartiles, row count and null percentage in one
+    parallel scan. Extra approximate quantiles for numeric columns are added as ``p<pct>``
+    columns, e.g. ``p1`` and ``p99`` for ``quantiles=[0.01, 0.99]``.
+
+    Args:
+        con: The database connection object.
+        source: A table name (optionally qualified), a csv/psv/parquet path, glob or list of
+            paths, or a pandas/Polars DataFrame or pyarrow Table.
+        quantiles (list, optional): Extra quantiles between 0 and 1 to compute for numeric columns.
+        format (str, optional): File format, inferred from the (first) path extension if omitted.
+        read_options (dict, optional): Extra arguments for ``read_csv``/``read_parquet``.
+        stats_table (str, optional): Table to append the profile to, e.g. ``table_stats`` next to
+            ``meta``. Rows are tagged with the source name and profiling time.
+
+    Returns:
+        DataFrame: One row per column of the source.
+    """
+    source_sql, view_name = _profile_source_sql(con, source, format, read_options)
+    try:
+        start = time.perf_counter()
+        stats = con.sql(f"SUMMARIZE SELECT * FROM {source_sql}").df()
+        numeric = [col for col, dtype in zip(stats["column_name"], stats["column_type"])
+                   if QUANTILE_TYPE_PATTERN.match(dtype)]
+        if quantiles and numeric:
+            points = _sql_literal([float(q) for q in quantiles])
+            values = con.execute("SELECT " + ", ".join(f'approx_quantile("{col}", {points})' for col in numeric)
+                                 + f" FROM {source_sql}").fetchone()
+            by_column = dict(zip(numeric, values))
+            for i, q in enumerate(quantiles):
+                stats[f"p{round(q * 100, 2):g}"] = [float(by_column[col][i]) if by_column.get(col) and
+                                                     by_column[col][i] is not None else None
+                                                     for col in stats["column_name"]]
+    finally:
+        if view_name is not None:
+            con.unregister(view_name)
+    print(f"Profiled {len(stats)} columns in {round(time.perf_counter() - start, 2)}s")
+
+    if stats_table:
+        stored = stats.copy()
+        stored.insert(0, "source", source if isinstance(source, str) else
+                      ", ".join(source) if isinstance(source, (list, tuple)) else type(source).__name__)
+        stored.insert(1, "profiled_at", pd.Timestamp.now(tz="UTC").tz_localize(None))
+        view_name = f"_profile_stats_{uuid.uuid4().hex}"
+        con.register(view_name, stored)
+        try:
+            if not _qualified_table_exists(con, stats_table):
+                con.execute(f"CREATE TABLE {stats_table} AS SELECT * FROM {view_name}")
+            else:
+                for col in stored.columns[stored.columns.str.match(r"^p[\d.]+$")]:
+                    con.execute(f'ALTER TABLE {stats_table} ADD COLUMN IF NOT EXISTS "{col}" DOUBLE')
+                con.execute(f"INSERT INTO {stats_table} BY NAME SELECT * FROM {view_name}")
+        finally:
+            con.unregister(view_name)
+    return stats
+
+def _hmac_pads(key: bytes) -> tuple:
+    """
+    Return the inner and outer padded HMAC-SHA256 keys for a key.
+    """
+    if len(key) > 64:
+        key = hashlib.sha256(key).digest()
+    key = key.ljust(64, b"\0")
+    return bytes(b ^ 0x36 for b in key), bytes(b ^ 0x5c for b in key)
+
+def register_hash_function(con, name: str, method: str = "sha256", salt="", engine: str = "sql"):
+    """
+    Register a datahash salted hashing scheme as a DuckDB function taking one VARCHAR argument.
+
+    With ``engine='sql'`` the function is a temporary macro over DuckDB's built-in ``sha256``
+    and ``md5``, so it runs natively and in parallel with no Python calls: 'sha256' is
+    ``sha256(x || salt)``, 'md5' is ``md5(salt || x)`` and 'hmac' is HMAC-SHA256 built from
+    the padded keys. Note the salt (or HMAC pads) is then part of the macro definition for
+    the connection's lifetime. With ``engine='arrow'`` it is a vectorised Arrow UDF that
+    hashes each batch with ``datahash.hash_column`` and keeps the salt in Python. Either way
+    the results equal ``hash256``, ``hashhmac`` and ``hashmd5``.
+
+    Args:
+        con: The database connection object.
+        name (str): Name of the SQL function to create.
+        method (str): 'sha256', 'hmac' or 'md5'. Default is 'sha256'.
+        salt (str or bytes): The salt, or for 'hmac' the key (str is UTF-8 encoded).
+        engine (str): 'sql' for a native macro or 'arrow' for an Arrow UDF. Default is 'sql'.
+
+    Example:
+        >>> register_hash_function(con, "pseudo_id", "hmac", key)
+        >>> con.execute("CREATE TABLE released AS SELECT pseudo_id(person_id) AS id, * EXCLUDE (person_id) FROM raw")
+    """
+    if method not in datahash.HASH_METHODS:
+        raise ValueError(f"method must be one of {datahash.HASH_METHODS}")
+    if engine == "arrow":
+        def _hash_batch(values):
+            return datahash.hash_column(values, method, salt, max_workers=1)
+        con.create_function(name, _hash_batch, ["VARCHAR"], "VARCHAR", type="arrow")
+        return
+    if engine != "sql":
+        raise ValueError("engine must be 'sql' or 'arrow'")
+
+    if method == "sha256":
+        body = f"sha256(x || {_sql_string(salt)})"
+    elif method == "md5":
+        body = f"md5({_sql_string(salt)} || x)"
+    else:
+        inner, outer = _hmac_pads(salt.encode("utf-8") if isinstance(salt, str) else salt)
+        # cast first so numeric columns are accepted like the sha256/md5 macros' implicit casts
+        body = (f"sha256(unhex('{outer.hex()}') || "
+                f"unhex(sha256(unhex('{inner.hex()}') || encode(CAST(x AS VARCHAR)))))")
+    con.execute(f"CREATE OR REPLACE TEMP MACRO {name}(x) AS {body}")
+
 def make_version_meta_table(con, schema_version:str, db_name:str):
         """
         Create or update a meta table including the following content:
@@ -190,3 +1347,519 @@ def make_version_meta_table(con, schema_version:str, db_name:str):
             ("python_version", pyver)
         ]
         con.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", meta_entries)
+        # the data version entries were deleted with the rest of the meta table
+        _forget_table_fingerprints()
+
+class _ProfiledResult:
+    """
+    Statement result returned by ``QueryProfiler.execute``, with the connection's fetch methods.
+
+    Fetches go straight to the connection's pending result, so profiling doesn't add a copy
+    of it. DuckDB completes a query's profile once the result has been read to the end,
+    which is when it is recorded.
+    """
+    def __init__(self, profiler, start: float):
+        self._profiler = profiler
+        self._con = profiler._con
+        self._start = start
+        self.description = self._con.description
+        self.done = False
+
+    def _fetched(self, exhausted: bool = True):
+        if exhausted and not self.done:
+            self.done = True
+            self._profiler._collect(time.perf_counter() - self._start)
+
+    def fetchone(self):
+        row = self._con.fetchone()
+        self._fetched(row is None)
+        return row
+
+    def fetchmany(self, size: int = 1) -> list:
+        rows = self._con.fetchmany(size)
+        self._fetched(len(rows) < size)
+        return rows
+
+    def fetchall(self) -> list:
+        rows = self._con.fetchall()
+        self._fetched()
+        return rows
+
+    def df(self) -> DataFrame:
+        frame = self._con.df()
+        self._fetched()
+        return frame
+
+    fetchdf = df
+
+    def arrow(self):
+        table = _to_arrow_table(self._con)
+        self._fetched()
+        return table
+
+    fetch_arrow_table = to_arrow_table = arrow
+
+    def pl(self):
+        frame = self._con.pl()
+        self._fetched()
+        return frame
+
+    def finish(self):
+        """
+        Read whatever is left of the result in Arrow batches, discarding it, so its profile is recorded.
+        """
+        if self.done:
+            return
+        try:
+            for _ in _to_arrow_reader(self._con, 1_000_000):
+                pass
+        except duckdb.Error:
+            # the result was already replaced by a statement run outside the profiler
+            self.done = True
+            return
+        self._fetched()
+
+class QueryProfiler:
+    """
+    Connection wrapper that records DuckDB's JSON profile of every statement it executes.
+
+    Returned by ``profile_queries``. It behaves like the connection it wraps, so it can be
+    passed to the duckfunc functions in place of ``con``. ``execute`` returns a result with
+    the usual ``fetchone``/``fetchall``/``df``/``arrow``/``pl`` methods, read directly from
+    DuckDB. DuckDB only completes a query's profile once its result has been read to the
+    end, so a partly fetched result is streamed to the end, and discarded, when the next
+    statement is executed or profiling stops.
+    Statements without a physical plan (``SET``, transaction control, ``INSERT ... VALUES``)
+    have no profile and are not recorded. Queries run through ``sql``/``query`` relations
+    or separate cursors are not profiled.
+
+    Attributes:
+        records (list): One dict per profiled statement with ``logged_at``, ``query``,
+            ``wall_time`` (seconds to execute and fetch), ``latency`` (DuckDB's own timing),
+            ``cpu_time``, ``rows``, ``peak_memory``, ``operators`` (JSON list of operator
+            name, timing and rows, slowest first) and ``plan`` (the EXPLAIN ANALYZE tree).
+    """
+    def __init__(self, con):
+        self._con = con
+        self.records = []
+        self._last_profile = None
+        self._pending = None
+        self._profile_path = os.path.join(tempfile.gettempdir(), f"duck_profile_{uuid.uuid4().hex}.json")
+
+    def __getattr__(self, name):
+        return getattr(self._con, name)
+
+    def start(self):
+        """
+        Enable JSON profiling, written to a temporary file rather than stdout.
+        """
+        self._con.execute("PRAGMA enable_profiling = 'json'")
+        self._con.execute(f"SET profiling_output = {_sql_string(self._profile_path)}")
+
+    def stop(self):
+        """
+        Record any partly fetched result, then disable profiling.
+        """
+        self._finish_pending()
+        self._con.execute("PRAGMA disable_profiling")
+        self._con.execute("RESET profiling_output")
+        if os.path.exists(self._profile_path):
+            os.remove(self._profile_path)
+
+    def _read_profile(self):
+        if hasattr(self._con, "get_profiling_information"):
+            return self._con.get_profiling_information()
+        if os.path.exists(self._profile_path):
+            return fileio.read_file_to_string(self._profile_path)
+        return None
+
+    def _collect(self, wall_time: float):
+        """
+        Record the profile of the statement that just ran, if it has one.
+        """
+        raw = self._read_profile()
+        if not raw or raw == self._last_profile:
+            return
+        self._last_profile = raw
+        profile = json.loads(raw)
+        query = profile.get("query_name")
+        if not query:
+            return
+        operators = []
+        nodes = list(profile.get("children", []))
+        while nodes:
+            node = nodes.pop()
+            operators.append({"operator": node.get("operator_name") or node.get("operator_type"),
+                              "timing": node.get("operator_timing", 0.0),
+                              "rows": node.get("operator_cardinality", 0)})
+            nodes.extend(node.get("children", []))
+        operators.sort(key=lambda op: op["timing"], reverse=True)
+        plan = None
+        if hasattr(self._con, "get_profiling_information"):
+            plan = self._con.get_profiling_information(format="query_tree")
+        self.records.append({
+            "logged_at": datetime.now(),
+            "query": query,
+            "wall_time": wall_time,
+            "latency": profile.get("latency"),
+            "cpu_time": profile.get("cpu_time"),
+            "rows": profile.get("rows_returned"),
+            "peak_memory": profile.get("system_peak_buffer_memory"),
+            "operators": json.dumps(operators),
+            "plan": plan,
+        })
+
+    def _finish_pending(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            pending.finish()
+
+    def _run(self, method, query: str, parameters):
+        self._finish_pending()
+        start = time.perf_counter()
+        method(query, parameters)
+        # DDL and DML profiles are complete after execute, query profiles once fully fetched
+        self._collect(time.perf_counter() - start)
+        self._pending = _ProfiledResult(self, start)
+        return self._pending
+
+    def execute(self, query: str, parameters=None):
+        """
+        Execute a statement on the wrapped connection and record its profile.
+        """
+        return self._run(self._con.execute, query, parameters)
+
+    def executemany(self, query: str, parameters=None):
+        """
+        Execute a statement for each set of parameters and record the profile of the last.
+        """
+        return self._run(self._con.executemany, query, parameters)
+
+    def to_dataframe(self) -> DataFrame:
+        """
+        Return the recorded profiles as a DataFrame.
+        """
+        return pd.DataFrame(self.records, columns=["logged_at", "query", "wall_time", "latency", "cpu_time",
+                                                   "rows", "peak_memory", "operators", "plan"])
+
+@contextmanager
+def profile_queries(con, log_table: str = "query_log", log_dir: str = None):
+    """
+    Opt-in profiling of the statements executed within a block.
+
+    Yields a ``QueryProfiler`` to use in place of the connection. On leaving the block
+    profiling is switched off and the collected profiles are appended to ``log_table``
+    and/or written to a new Parquet file in ``log_dir``. Use ``get_slowest_queries`` to
+    read them back.
+
+    Args:
+        con: The database connection object.
+        log_table (str, optional): Table to append profiles to. Default is 'query_log';
+            None to skip.
+        log_dir (str, optional): Directory to write a ``query_log_*.parquet`` file to.
+
+    Example:
+        >>> with profile_queries(con) as profiled:
+        ...     bulk_load(profiled, "sales", "landing/*.parquet", mode="append")
+        >>> get_slowest_queries(con, n=5)
+    """
+    profiler = QueryProfiler(con)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        if profiler.records:
+            log = pa.Table.from_pandas(profiler.to_dataframe(), preserve_index=False)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
+                stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                pq.write_table(log, os.path.join(log_dir, f"query_log_{stamp}_{uuid.uuid4().hex[:8]}.parquet"))
+            if log_table:
+                view_name = f"_query_log_{uuid.uuid4().hex}"
+                con.register(view_name, log)
+                try:
+                    if _qualified_table_exists(con, log_table):
+                        con.execute(f"INSERT INTO {log_table} BY NAME SELECT * FROM {view_name}")
+                    else:
+                        con.execute(f"CREATE TABLE {log_table} AS SELECT * FROM {view_name}")
+                finally:
+                    con.unregister(view_name)
+
+def get_slowest_queries(con, n: int = 10, log_table: str = "query_log", log_dir: str = None) -> DataFrame:
+    """
+    List the slowest profiled queries from a query log table or Parquet log directory.
+
+    Args:
+        con: The database connection object.
+        n (int): Number of queries to return. Default is 10.
+        log_table (str): Query log table. Default is 'query_log'.
+        log_dir (str, optional): Read the Parquet logs in this directory instead of the table.
+
+    Returns:
+        DataFrame: The ``n`` queries with the highest latency, slowest first.
+    """
+    source = _read_function([os.path.join(log_dir, "query_log_*.parquet")], "parquet") if log_dir else log_table
+    return con.execute(f"SELECT logged_at, query, latency, wall_time, rows, operators FROM {source} "
+                       "ORDER BY latency DESC NULLS LAST LIMIT ?", [n]).df()
+
+def _bare_table_name(tablename: str) -> str:
+    """
+    A table's name without its database/schema qualifier or quotes.
+    """
+    return tablename.split(".")[-1].strip('"')
+
+def _data_version_key(tablename: str) -> str:
+    """
+    Meta table key recording a table's data version, from its bare (unqualified, unquoted) name.
+    """
+    return f"{_bare_table_name(tablename)}_data_version"
+
+# query caches whose table fingerprints are dropped when duckfunc changes a table
+_QUERY_CACHES = weakref.WeakSet()
+_MAX_PARSED_QUERIES = 4096
+
+def _forget_table_fingerprints(tablename: str = None):
+    """
+    Drop the cached fingerprint of a table, or of every table, from all query caches.
+    """
+    for cache in list(_QUERY_CACHES):
+        cache.forget(tablename)
+
+def touch_table_version(con, tablename: str, create_meta: bool = True) -> bool:
+    """
+    Record in the meta table that a table's data has changed.
+
+    The entry ``<table>_data_version`` is set to a new value, which ``DuckQueryCache``
+    includes in its fingerprint so cached results for the table are no longer served.
+    The key uses the bare table name, so ``main.sales`` and ``sales`` share one entry.
+    DuckDB's catalog does not change on updates or deletes, so loaders that rewrite rows
+    should call this after committing; ``bulk_load``, ``upsert`` and ``append_new`` do.
+
+    Args:
+        con: The database connection object.
+        tablename (str): The table whose data changed.
+        create_meta (bool): Create the meta table if it does not exist. Default is True.
+
+    Returns:
+        bool: True if the version was recorded, False if there is no meta table.
+    """
+    if not _qualified_table_exists(con, "meta"):
+        if not create_meta:
+            return False
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key VARCHAR PRIMARY KEY,
+                value VARCHAR
+            )
+        """)
+    con.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [_data_version_key(tablename), f"{getCurrentTimeForDuck()} {uuid.uuid4().hex}"])
+    _forget_table_fingerprints(tablename)
+    return True
+
+def _normalise_sql(query: str) -> str:
+    """
+    Normalise whitespace and trailing semicolons in a query, leaving string literals untouched.
+    """
+    parts = re.split(r"('(?:[^']|'')*')", query.strip().rstrip(";").strip())
+    return "".join(part if i % 2 else " ".join(part.split()) for i, part in enumerate(parts))
+
+class DuckQueryCache:
+    """
+    LRU cache of DuckDB query results held as Arrow tables.
+
+    Results are keyed by the normalised SQL, its parameters and a fingerprint of the tables
+    it reads: their catalog entries (oid, size, columns, definition) and their
+    ``<table>_data_version`` entries in the meta table (see ``touch_table_version``, which
+    ``bulk_load``, ``upsert`` and ``append_new`` call). A load that changes either produces a
+    new key, so stale results are never served. Memory use is capped at ``max_bytes``; results
+    evicted from memory are written to Parquet in ``spill_dir`` if one is given and read
+    back from there on the next hit.
+
+    Each table's fingerprint is read once and kept until ``touch_table_version`` or a duckfunc
+    DDL path (``init_table``, ``init_tables``, ``DuckCatalog.execute``) changes the table, so
+    a cache hit runs no catalog queries. After DDL run directly on the connection, call
+    ``forget``.
+
+    Args:
+        con: The database connection object.
+        max_bytes (int): Memory budget for cached results. Default is 512 MB.
+        spill_dir (str, optional): Directory for Parquet copies of evicted results.
+
+    Example:
+        >>> cache = DuckQueryCache(con)
+        >>> totals = cache.query("SELECT region, SUM(sales) FROM sales GROUP BY region")
+    """
+    def __init__(self, con, max_bytes: int = 512 * 1024 * 1024, spill_dir: str = None):
+        self.con = con
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # tables read by each normalised query, and the fingerprint of each bare table name
+        self._table_names = OrderedDict()
+        self._fingerprints = {}
+        self._generation = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        _QUERY_CACHES.add(self)
+
+    def _tables_read(self, sql: str):
+        """
+        Sorted bare names of the tables a normalised query reads, or None if it can't be parsed.
+        """
+        with self._lock:
+            if sql in self._table_names:
+                self._table_names.move_to_end(sql)
+                return self._table_names[sql]
+        try:
+            names = sorted({_bare_table_name(name) for name in self.con.get_table_names(sql)})
+        except Exception:
+            names = None
+        with self._lock:
+            self._table_names[sql] = names
+            if len(self._table_names) > _MAX_PARSED_QUERIES:
+                self._table_names.popitem(last=False)
+        return names
+
+    def _read_fingerprints(self, names: list = None) -> dict:
+        """
+        Catalog entries and data versions of the named tables (all tables if None), by bare name.
+        """
+        table_sql = ("SELECT database_name, schema_name, table_name, table_oid, estimated_size, column_count, sql "
+                     "FROM duckdb_tables")
+        if names is None:
+            tables = self.con.execute(table_sql + " ORDER BY ALL").fetchall()
+        else:
+            tables = self.con.execute(table_sql + " WHERE list_contains(?, table_name) ORDER BY ALL",
+                                      [names]).fetchall()
+        versions = {}
+        if _qualified_table_exists(self.con, "meta"):
+            if names is None:
+                versions = dict(self.con.execute("SELECT key, value FROM meta").fetchall())
+            else:
+                versions = dict(self.con.execute("SELECT key, value FROM meta WHERE list_contains(?, key)",
+                                                 [[_data_version_key(name) for name in names]]).fetchall())
+        fingerprints = {name: [] for name in names or ()}
+        for row in tables:
+            fingerprints.setdefault(row[2], []).append(row)
+        return {name: (tuple(rows), versions.get(_data_version_key(name)))
+                for name, rows in fingerprints.items()}
+
+    def _fingerprint(self, sql: str) -> tuple:
+        """
+        Catalog and meta table state of the tables a query reads.
+        """
+        names = self._tables_read(sql)
+        if names is None:
+            return tuple(sorted(self._read_fingerprints().items()))
+        with self._lock:
+            generation = self._generation
+            known = {name: self._fingerprints[name] for name in names if name in self._fingerprints}
+        missing = [name for name in names if name not in known]
+        if missing:
+            read = self._read_fingerprints(missing)
+            with self._lock:
+                # a table changed while its fingerprint was read may have been read stale
+                if generation == self._generation:
+                    self._fingerprints.update(read)
+            known.update(read)
+        return tuple((name, known[name]) for name in names)
+
+    def _key(self, query: str, parameters) -> str:
+        sql = _normalise_sql(query)
+        payload = repr((sql, parameters, self._fingerprint(sql)))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def forget(self, tablename: str = None):
+        """
+        Drop the cached fingerprint of a table, or of every table if none is given.
+
+        The next query reading the table looks up its catalog entry and data version again.
+        ``touch_table_version`` and the duckfunc DDL paths call this on every cache; call it
+        after DDL (e.g. ``CREATE OR REPLACE TABLE``) run directly on the connection.
+
+        Args:
+            tablename (str, optional): The table, optionally qualified.
+        """
+        with self._lock:
+            self._generation += 1
+            if tablename is None:
+                self._fingerprints.clear()
+            else:
+                self._fingerprints.pop(_bare_table_name(tablename), None)
+
+    def _spill_path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, f"{key}.parquet")
+
+    def _store(self, key: str, table):
+        """
+        Add a result to memory, evicting (and spilling) least recently used results over budget.
+        """
+        self._entries[key] = table
+        self._bytes += table.nbytes
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            old_key, old_table = self._entries.popitem(last=False)
+            self._bytes -= old_table.nbytes
+            if self.spill_dir and not os.path.exists(self._spill_path(old_key)):
+                pq.write_table(old_table, self._spill_path(old_key))
+
+    def query(self, query: str, parameters=None):
+        """
+        Run a query, or return its cached result.
+
+        Args:
+            query (str): The SQL query.
+            parameters (list, optional): Query parameters.
+
+        Returns:
+            pyarrow.Table: The query result. Treat it as read only, it is shared with the cache.
+        """
+        key = self._key(query, parameters)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            if self.spill_dir and os.path.exists(self._spill_path(key)):
+                table = pq.read_table(self._spill_path(key))
+                self._store(key, table)
+                self.hits += 1
+                return table
+
+        table = _to_arrow_table(self.con.execute(query, parameters))
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries:
+                self._store(key, table)
+        return table
+
+    def query_df(self, query: str, parameters=None) -> DataFrame:
+        """
+        Run a query through the cache and return the result as a pandas DataFrame.
+        """
+        return self.query(query, parameters).to_pandas()
+
+    def invalidate(self):
+        """
+        Drop every cached result, from memory and the spill directory.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._generation += 1
+            self._fingerprints.clear()
+            if self.spill_dir:
+                for path in glob.glob(os.path.join(self.spill_dir, "*.parquet")):
+                    os.remove(path)
+
+    def stats(self) -> dict:
+        """
+        Return hit and miss counts and the memory held by cached results.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._bytes}
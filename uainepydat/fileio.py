@@ -1,10 +1,24 @@
 import os
 import glob
+import json
+import time
+import random
+import sqlite3
+import fnmatch
+import hashlib
 import subprocess
 import sys
 import uuid
 import requests
 import shutil
+from datetime import datetime
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
 def list_files_of_extension(directory: str, extn: str) -> list[str]:
     """
@@ -186,28 +200,304 @@ def list_dirs(main_dir: str) -> list:
     lsd = [dir for dir in lsall if os.path.isdir(os.path.join(main_dir, dir))]
     return lsd
 
-import os
-import hashlib
+# Checksum algorithms provided by the optional xxhash package
+XXHASH_ALGORITHMS = ("xxh32", "xxh64", "xxh3_64", "xxh3_128", "xxh128")
+
+def _new_hasher(algorithm: str):
+    """
+    Create a hash object for a hashlib algorithm name or an xxhash algorithm.
+    """
+    if algorithm in XXHASH_ALGORITHMS:
+        if xxhash is None:
+            raise ImportError(f"xxhash is required for {algorithm}. Install it with 'pip install xxhash'.")
+        return getattr(xxhash, algorithm)()
+    return hashlib.new(algorithm)
 
-def calculate_checksums(dir_path):
+def calculate_file_checksum(file_path: str, algorithm: str = "md5", chunk_size: int = 8 * 1024 * 1024) -> str:
     """
-    Calculate MD5 checksums for all files in the specified directory.
+    Calculate the checksum of a single file by streaming it in fixed-size chunks.
+
+    Chunks are read into one reused buffer, so arbitrarily large files are hashed in
+    constant memory. hashlib releases the GIL while hashing large buffers, so files can be
+    hashed in parallel threads.
+
+    :param file_path: Path to the file to hash.
+    :type file_path: str
+    :param algorithm: Name of a hashlib algorithm (e.g. 'md5', 'sha256', 'blake2b') or, if the
+        xxhash package is installed, one of ``XXHASH_ALGORITHMS``. Defaults to 'md5'.
+    :type algorithm: str
+    :param chunk_size: Number of bytes read per iteration. Defaults to 8 MB.
+    :type chunk_size: int
+    :return: Hexadecimal digest of the file content.
+    :rtype: str
+    """
+    hasher = _new_hasher(algorithm)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(file_path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            hasher.update(view[:n])
+    return hasher.hexdigest()
+
+def list_files(dir_path: str, recursive: bool = True, include: list = None, exclude: list = None) -> list:
+    """
+    List the files below a directory, filtered by glob patterns on their relative paths.
+
+    :param dir_path: The directory to search in.
+    :type dir_path: str
+    :param recursive: Whether to descend into subdirectories. Defaults to True.
+    :type recursive: bool
+    :param include: Patterns (e.g. ``["*.psv"]``) a relative path must match one of. Defaults to all files.
+    :type include: list
+    :param exclude: Patterns a relative path must not match (e.g. ``["tmp/*"]``).
+    :type exclude: list
+    :return: Sorted list of file paths.
+    :rtype: list
+    """
+    paths = []
+    for root, dirs, files in os.walk(dir_path):
+        if not recursive:
+            dirs.clear()
+        for filename in files:
+            full_filename = os.path.join(root, filename)
+            rel_path = os.path.relpath(full_filename, dir_path).replace(os.sep, "/")
+            if include and not any(fnmatch.fnmatch(rel_path, pattern) for pattern in include):
+                continue
+            if exclude and any(fnmatch.fnmatch(rel_path, pattern) for pattern in exclude):
+                continue
+            paths.append(full_filename)
+    return sorted(paths)
+
+def calculate_checksums(dir_path: str, algorithm: str = "md5", recursive: bool = True, include: list = None,
+                        exclude: list = None, max_workers: int = 8, chunk_size: int = 8 * 1024 * 1024,
+                        manifest_path: str = None) -> dict:
+    """
+    Calculate checksums for all files in the specified directory.
+
+    Files are streamed through ``calculate_file_checksum`` on a thread pool, so memory use is
+    bounded by ``max_workers * chunk_size`` whatever the file sizes.
 
     :param dir_path: Path to the directory containing files.
     :type dir_path: str
-    :return: Dictionary mapping file paths to their MD5 checksum.
+    :param algorithm: hashlib algorithm (e.g. 'md5', 'sha256', 'blake2b') or xxhash algorithm. Defaults to 'md5'.
+    :type algorithm: str
+    :param recursive: Whether to include files in subdirectories. Defaults to True.
+    :type recursive: bool
+    :param include: Glob patterns on relative paths to include. Defaults to all files.
+    :type include: list
+    :param exclude: Glob patterns on relative paths to exclude.
+    :type exclude: list
+    :param max_workers: Number of files hashed at once. Defaults to 8.
+    :type max_workers: int
+    :param chunk_size: Number of bytes read per iteration. Defaults to 8 MB.
+    :type chunk_size: int
+    :param manifest_path: Optional JSON file to write the algorithm, relative paths, sizes and checksums to.
+    :type manifest_path: str
+    :return: Dictionary mapping file paths to their checksum.
     :rtype: dict
     """
-    file_dict = {}
-    for filename in os.listdir(dir_path):
-        full_filename = os.path.join(dir_path, filename)
-        with open(full_filename, 'rb') as f:
-            content = f.read()
-            checksum = hashlib.md5(content).hexdigest()
-            file_dict[full_filename] = checksum
-
+    paths = list_files(dir_path, recursive, include, exclude)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        checksums = executor.map(lambda path: calculate_file_checksum(path, algorithm, chunk_size), paths)
+        file_dict = dict(zip(paths, checksums))
+
+    if manifest_path:
+        manifest = {
+            "root": os.path.abspath(dir_path),
+            "algorithm": algorithm,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "files": {os.path.relpath(path, dir_path).replace(os.sep, "/"):
+                      {"size": os.path.getsize(path), "checksum": checksum}
+                      for path, checksum in file_dict.items()},
+        }
+        create_filepath_dirs(manifest_path)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
     return file_dict
 
+@contextmanager
+def sqlite_connection(path: str):
+    """
+    Open a SQLite connection that commits on success, rolls back on error and is always closed.
+
+    :param path: The path of the SQLite database file.
+    :return: A context manager yielding the connection.
+    """
+    con = sqlite3.connect(path, timeout=60)
+    try:
+        with con:
+            yield con
+    finally:
+        con.close()
+
+class ChecksumCache:
+    """
+    Persistent SQLite cache of file checksums, so unchanged files are not rehashed.
+
+    Entries are keyed by absolute path and algorithm, and are reused while the file's size,
+    ``mtime_ns`` and inode are unchanged; anything else is rehashed in parallel and stored.
+    ``verify`` rehashes a random sample of unchanged entries to catch silent corruption
+    that leaves the file metadata untouched.
+
+    Args:
+        cache_path (str): Path of the SQLite database file.
+        algorithm (str): Checksum algorithm, as for ``calculate_file_checksum``. Defaults to 'md5'.
+
+    Example:
+        >>> cache = ChecksumCache("/data/.checksums.sqlite")
+        >>> sums = cache.calculate_checksums("/data/landing", include=["*.psv"])
+    """
+    def __init__(self, cache_path: str, algorithm: str = "md5"):
+        self.cache_path = cache_path
+        self.algorithm = algorithm
+        self.last_run = {}
+        create_filepath_dirs(cache_path)
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS checksums (
+                    path TEXT NOT NULL,
+                    algorithm TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    checksum TEXT NOT NULL,
+                    hashed_at REAL NOT NULL,
+                    PRIMARY KEY (path, algorithm)
+                )
+            """)
+
+    def _connect(self):
+        return sqlite_connection(self.cache_path)
+
+    def _cached(self) -> dict:
+        with self._connect() as con:
+            rows = con.execute("SELECT path, size, mtime_ns, inode, checksum FROM checksums WHERE algorithm = ?",
+                               (self.algorithm,)).fetchall()
+        return {path: (size, mtime_ns, inode, checksum) for path, size, mtime_ns, inode, checksum in rows}
+
+    def get_checksums(self, paths: list, max_workers: int = 8, chunk_size: int = 8 * 1024 * 1024) -> dict:
+        """
+        Return checksums for a list of files, hashing only those that are new or modified.
+
+        :param paths: File paths.
+        :type paths: list
+        :param max_workers: Number of files hashed at once. Defaults to 8.
+        :type max_workers: int
+        :param chunk_size: Number of bytes read per iteration. Defaults to 8 MB.
+        :type chunk_size: int
+        :return: Dictionary mapping the given file paths to their checksum.
+        :rtype: dict
+        """
+        cached = self._cached()
+        file_dict = {}
+        stale = {}
+        for path in paths:
+            abs_path = os.path.abspath(path)
+            stat = os.stat(abs_path)
+            key = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+            entry = cached.get(abs_path)
+            if entry is not None and entry[:3] == key:
+                file_dict[path] = entry[3]
+            else:
+                stale[path] = (abs_path,) + key
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            checksums = executor.map(lambda path: calculate_file_checksum(path, self.algorithm, chunk_size), stale)
+            file_dict.update(zip(stale, checksums))
+        if stale:
+            now = time.time()
+            with self._connect() as con:
+                con.executemany("INSERT OR REPLACE INTO checksums VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                [(abs_path, self.algorithm, size, mtime_ns, inode, file_dict[path], now)
+                                 for path, (abs_path, size, mtime_ns, inode) in stale.items()])
+
+        self.last_run = {"files": len(file_dict), "hashed": len(stale), "reused": len(file_dict) - len(stale)}
+        print(f"Checksums for {len(file_dict)} files: {len(stale)} hashed, {len(file_dict) - len(stale)} from cache")
+        return {path: file_dict[path] for path in paths}
+
+    def calculate_checksums(self, dir_path: str, recursive: bool = True, include: list = None, exclude: list = None,
+                            max_workers: int = 8, chunk_size: int = 8 * 1024 * 1024, prune: bool = False) -> dict:
+        """
+        Cached equivalent of ``calculate_checksums`` for the files below a directory.
+
+        :param dir_path: Path to the directory containing files.
+        :type dir_path: str
+        :param recursive: Whether to include files in subdirectories. Defaults to True.
+        :type recursive: bool
+        :param include: Glob patterns on relative paths to include. Defaults to all files.
+        :type include: list
+        :param exclude: Glob patterns on relative paths to exclude.
+        :type exclude: list
+        :param max_workers: Number of files hashed at once. Defaults to 8.
+        :type max_workers: int
+        :param chunk_size: Number of bytes read per iteration. Defaults to 8 MB.
+        :type chunk_size: int
+        :param prune: Remove cache entries below dir_path for files that no longer exist. Defaults to False.
+        :type prune: bool
+        :return: Dictionary mapping file paths to their checksum.
+        :rtype: dict
+        """
+        paths = list_files(dir_path, recursive, include, exclude)
+        file_dict = self.get_checksums(paths, max_workers, chunk_size)
+        if prune:
+            root = os.path.join(os.path.abspath(dir_path), "")
+            with self._connect() as con:
+                listed = con.execute("SELECT path FROM checksums WHERE substr(path, 1, ?) = ?",
+                                     (len(root), root)).fetchall()
+                gone = [(path,) for (path,) in listed if not os.path.exists(path)]
+                con.executemany("DELETE FROM checksums WHERE path = ?", gone)
+        return file_dict
+
+    def verify(self, sample: float = 0.01, max_workers: int = 8, chunk_size: int = 8 * 1024 * 1024,
+               seed: int = None) -> dict:
+        """
+        Rehash a random sample of cached files whose metadata is unchanged and compare checksums.
+
+        A mismatch means the content changed without its size, mtime or inode changing, e.g.
+        bit rot or a tool that restores timestamps. The cached checksum is kept as the reference.
+
+        :param sample: Fraction of entries to check as a float up to 1.0, or a number of entries as an int.
+            Defaults to 0.01.
+        :type sample: float or int
+        :param max_workers: Number of files hashed at once. Defaults to 8.
+        :type max_workers: int
+        :param chunk_size: Number of bytes read per iteration. Defaults to 8 MB.
+        :type chunk_size: int
+        :param seed: Random seed for a reproducible sample.
+        :type seed: int
+        :return: Dictionary with ``checked`` (number of files) and ``corrupted`` (list of
+            (path, cached checksum, current checksum) tuples).
+        :rtype: dict
+        """
+        candidates = []
+        for path, (size, mtime_ns, inode, checksum) in self._cached().items():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if (stat.st_size, stat.st_mtime_ns, stat.st_ino) == (size, mtime_ns, inode):
+                candidates.append((path, checksum))
+        count = max(1, round(len(candidates) * sample)) if isinstance(sample, float) and sample <= 1 else int(sample)
+        chosen = random.Random(seed).sample(candidates, min(count, len(candidates)))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            current = executor.map(lambda item: calculate_file_checksum(item[0], self.algorithm, chunk_size), chosen)
+            corrupted = [(path, checksum, actual) for (path, checksum), actual in zip(chosen, current)
+                         if actual != checksum]
+        print(f"Verified {len(chosen)} cached checksums: {len(corrupted)} corrupted")
+        return {"checked": len(chosen), "corrupted": corrupted}
+
+    def clear(self):
+        """
+        Remove every cached checksum.
+        """
+        with self._connect() as con:
+            con.execute("DELETE FROM checksums")
+
 # def test_calculate_checksums():
 #     """
 #     Test function for calculate_checksums.
@@ -1,3 +1,4 @@
+import os
 import shutil
 import psutil
 import pandas as pd
@@ -86,6 +87,28 @@ def get_largest_drive() -> dict[str, any]:
     index = df["space_free_gb"].idxmax()
     return df.iloc[index]
 
+def get_largest_writable_mountpoint() -> str:
+    """
+    Identifies the writable mount point (or drive root on Windows) with the most free space.
+
+    Unlike ``get_largest_drive()``, the full mount point path is returned so it can be used
+    directly as a location for files, such as database spill directories.
+
+    Returns:
+        str: The mount point path, or None if no writable mount point is accessible.
+    """
+    best, best_free = None, -1
+    for partition in psutil.disk_partitions():
+        if "ro" in partition.opts.split(","):
+            continue
+        try:
+            free = shutil.disk_usage(partition.mountpoint).free
+        except OSError:
+            continue
+        if free > best_free and os.access(partition.mountpoint, os.W_OK):
+            best, best_free = partition.mountpoint, free
+    return best
+
 def get_free_ram_in_gb() -> float:
     """
     Get the amount of free RAM on the system in gigabytes.